@@ -0,0 +1,3 @@
+# bench/__init__.py
+# Reproducible benchmarks: seed a local database, load test the API, time the scoring model
+# Run with: python -m bench seed --scale 10000; python -m bench load; python -m bench scoring
@@ -0,0 +1,138 @@
+# bench/__main__.py
+# Command line entry point: python -m bench {seed,fixtures,load,scoring} ...
+
+import argparse
+import asyncio
+import sys
+
+from bench.report import compare, load_result, result, write_result
+
+
+def _finish(args, document: dict):
+    """Save and compare a result as asked on the command line; returns the exit status."""
+    if args.output:
+        write_result(args.output, document)
+    if args.baseline:
+        lines, regressed = compare(document, load_result(args.baseline), args.tolerance)
+        print("\n".join(lines))
+        if regressed:
+            print(f"Regression beyond {args.tolerance}% against {args.baseline}")
+            return 1
+    return 0
+
+
+def seed_command(args) -> int:
+    from bench.seed import ensure_database, scale_plan, seed
+    from ingestion.db import connect
+    from ingestion.universe import load_universe
+
+    plan = scale_plan(args.scale, index_rows=args.index_rows, history_days=args.history_days, users=args.users,
+                      posts=args.posts, replies=args.replies, calculations=args.calculations)
+    if not args.no_create:
+        ensure_database(args.dsn)
+    universes = [load_universe(path) for path in args.universes]
+    print(f"Seeding {args.dsn} with {plan}")
+    conn = connect(args.dsn)
+    try:
+        counts = seed(conn, universes, plan, args.seed)
+    finally:
+        conn.close()
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    return 0
+
+
+def fixtures_command(args) -> int:
+    from bench.fixtures import write_fixtures
+    from ingestion.universe import load_universe
+
+    universes = [load_universe(path) for path in args.universes]
+    count = write_fixtures(universes, args.fixtures, args.seed)
+    print(f"Fixtures for {count} tickers written to {args.fixtures}")
+    return 0
+
+
+def load_command(args) -> int:
+    from bench.load import format_load, parse_mix, run_load
+
+    mix = parse_mix(args.mix)
+    print(f"Load test of {args.url}: {args.concurrency} workers, {args.warmup:g}s warmup + {args.duration:g}s, mix {mix}")
+    results = asyncio.run(run_load(args.url, mix, args.concurrency, args.duration, args.warmup,
+                                   args.users, args.logins, args.seed))
+    print(format_load(results))
+    config = {key: getattr(args, key) for key in ("url", "concurrency", "duration", "warmup", "users", "logins", "seed")}
+    return _finish(args, result("load", {**config, "mix": mix}, results))
+
+
+def scoring_command(args) -> int:
+    from bench.scoring import format_scoring, run_scoring
+
+    results = run_scoring(args.sizes, args.repeat, args.seed)
+    print(format_scoring(results))
+    return _finish(args, result("scoring", {"sizes": args.sizes, "repeat": args.repeat, "seed": args.seed}, results))
+
+
+def main(argv=None):
+    from bench.load import DEFAULT_MIX
+    from bench.scoring import DEFAULT_SIZES
+    from bench.seed import BENCH_DSN
+    from ingestion.sources import FIXTURES_PATH
+
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Reproducible benchmarks of the API and scoring model")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Shared by the commands that produce results
+    results = argparse.ArgumentParser(add_help=False)
+    results.add_argument("--output", metavar="PATH", help="write the results as JSON")
+    results.add_argument("--baseline", metavar="PATH", help="compare with results saved by an earlier --output")
+    results.add_argument("--tolerance", type=float, metavar="PCT",
+                         help="exit with status 1 when a case is worse than the baseline by more than PCT percent")
+
+    seed = commands.add_parser("seed", help="create and fill a benchmark database with synthetic rows")
+    seed.add_argument("universes", nargs="*", metavar="UNIVERSE",
+                      default=["universes/sp500.json", "universes/nasdaq100.json"],
+                      help="universe config files naming the index tables to fill")
+    seed.add_argument("--dsn", default=BENCH_DSN, help="benchmark database; every table in it is truncated")
+    seed.add_argument("--scale", type=int, default=10_000, help="calculation rows; the other tables scale with it")
+    seed.add_argument("--index-rows", type=int, help="companies per index table")
+    seed.add_argument("--history-days", type=int, help="daily snapshots per company in the history table")
+    seed.add_argument("--users", type=int)
+    seed.add_argument("--posts", type=int)
+    seed.add_argument("--replies", type=int)
+    seed.add_argument("--calculations", type=int)
+    seed.add_argument("--seed", type=float, default=0.42, help="seed of the database's random(), between -1 and 1")
+    seed.add_argument("--no-create", action="store_true", help="do not create the database when it is missing")
+    seed.set_defaults(handler=seed_command)
+
+    fixtures = commands.add_parser("fixtures", help="write synthetic yfinance fixtures for python -m ingestion --source replay")
+    fixtures.add_argument("universes", nargs="*", metavar="UNIVERSE",
+                          default=["universes/sp500.json", "universes/nasdaq100.json"],
+                          help="universe config files naming the tickers")
+    fixtures.add_argument("--fixtures", default=FIXTURES_PATH, metavar="PATH", help="fixture directory to write")
+    fixtures.add_argument("--seed", type=int, default=42)
+    fixtures.set_defaults(handler=fixtures_command)
+
+    load = commands.add_parser("load", parents=[results], help="load test a running API")
+    load.add_argument("--url", default="http://localhost:8000", help="base URL of the API (the FastAPI app, not Next.js)")
+    load.add_argument("--mix", default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+                      help="scenarios and their weights, e.g. sp500=4,forum=1")
+    load.add_argument("--concurrency", type=int, default=32, help="requests in flight at once")
+    load.add_argument("--duration", type=float, default=30, help="measured seconds")
+    load.add_argument("--warmup", type=float, default=5, help="seconds of load before measuring starts")
+    load.add_argument("--users", type=int, default=100, help="seeded users to log in as (bench1..benchN)")
+    load.add_argument("--logins", type=int, default=20, help="sessions opened up front for the calculation scenario")
+    load.add_argument("--seed", type=int, default=42)
+    load.set_defaults(handler=load_command)
+
+    scoring = commands.add_parser("scoring", parents=[results], help="micro-benchmark the scoring model")
+    scoring.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="universe sizes to time")
+    scoring.add_argument("--repeat", type=int, default=5, help="timing rounds per case")
+    scoring.add_argument("--seed", type=int, default=42)
+    scoring.set_defaults(handler=scoring_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+# bench/fixtures.py
+# Synthetic yfinance fixtures, so the loaders can be replayed without ever recording from Yahoo Finance
+
+import zlib
+
+from bench.scoring import synthetic_statements
+from ingestion.sources import FixtureStore
+from ingestion.universe import distinct_tickers
+
+
+def write_fixtures(universes: list, root: str, seed: int = 42) -> int:
+    """
+    Write financials, balance sheet, info and price fixtures for every ticker of `universes`.
+
+    Each ticker's payloads depend only on `seed` and the ticker, so the same
+    universes give the same fixtures. Returns the number of tickers written.
+    """
+    store = FixtureStore(root)
+    tickers = distinct_tickers(universes)
+    for symbol in tickers:
+        financials, balance_sheet, info = synthetic_statements(seed + zlib.crc32(symbol.encode()))
+        info = {**info, "longName": f"{symbol} Synthetic Holdings"}
+        store.save("financials", symbol, financials)
+        store.save("balance_sheet", symbol, balance_sheet)
+        store.save("info", symbol, info)
+        store.save("price", symbol, info["currentPrice"])
+    return len(tickers)
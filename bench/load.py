@@ -0,0 +1,193 @@
+# bench/load.py
+# Concurrent load generator for the API: per-route p50/p95/p99 latency and throughput
+
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from bench.report import latency_summary
+from bench.seed import BENCH_PASSWORD, NAME_WORDS
+
+# Screener sort keys the sp500_screen scenario picks from
+SCREEN_SORTS = ["rating", "roic", "margin_of_safety", "return_on_equity", "debt_to_equity"]
+
+# Default request mix: scenario -> relative weight
+DEFAULT_MIX = {"sp500": 4, "sp500_screen": 2, "forum": 2, "forum_feed": 2, "calculation": 3, "login": 1, "search": 2}
+
+
+def _email(user_id: int) -> str:
+    return f"bench{user_id}@example.com"
+
+
+class Scenarios:
+    """
+    Builds the next request of each scenario.
+
+    Requests are (method, path, keyword arguments for httpx). Random choices
+    come from the worker's own generator, so a run with the same seed and
+    concurrency sends the same requests.
+    """
+
+    def __init__(self, users: int, sessions: list):
+        self.users = users
+        self.sessions = sessions  # (user_id, token) of the users logged in during setup
+
+    def sp500(self, rng):
+        # The same screen every time: measures the response cache
+        return "GET", "/api/sp500", {"params": {"order_by": "rating", "order": "desc", "limit": 50}}
+
+    def sp500_screen(self, rng):
+        # Varying filters: mostly cache misses that reach the database
+        params = {
+            "roic_gt": rng.randint(0, 60),
+            "order_by": rng.choice(SCREEN_SORTS),
+            "order": rng.choice(["asc", "desc"]),
+            "limit": 50,
+        }
+        return "GET", "/api/sp500", {"params": params}
+
+    def forum(self, rng):
+        return "GET", "/api/forum", {}
+
+    def forum_feed(self, rng):
+        return "GET", "/api/forum/feed", {"params": {"limit": 20}}
+
+    def calculation(self, rng):
+        user_id, token = rng.choice(self.sessions)
+        return "GET", f"/api/calculation/{user_id}", {
+            "params": {"limit": 50}, "headers": {"Authorization": f"Bearer {token}"},
+        }
+
+    def search(self, rng):
+        # Type-ahead: a prefix of a name word, now and then with a typo
+        word = rng.choice(NAME_WORDS).lower()
+        query = word[:rng.randint(1, len(word))]
+        if len(query) > 3 and rng.random() < 0.2:
+            position = rng.randrange(len(query) - 1)
+            query = query[:position] + query[position + 1] + query[position] + query[position + 2:]
+        return "GET", "/api/search", {"params": {"q": query}}
+
+    def login(self, rng):
+        user_id = rng.randint(1, self.users)
+        return "POST", "/api/users/login", {"json": {"email": _email(user_id), "password_hash": BENCH_PASSWORD}}
+
+
+async def login_sessions(client, users: int, count: int, rng) -> list:
+    """Log in `count` of the seeded users and return their (user_id, token) pairs."""
+    sessions = []
+    for user_id in rng.sample(range(1, users + 1), min(count, users)):
+        response = await client.post("/api/users/login", json={"email": _email(user_id), "password_hash": BENCH_PASSWORD})
+        response.raise_for_status()
+        body = response.json()
+        sessions.append((body["user_id"], body["token"]))
+    return sessions
+
+
+class LoadRun:
+    """Latency samples and status codes per scenario, collected by the workers."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def record(self, scenario: str, seconds: float, status):
+        self.statuses[scenario][status] += 1
+        if isinstance(status, int) and status < 400:
+            self.latencies[scenario].append(seconds)
+        else:
+            self.errors[scenario] += 1
+
+    def summary(self, duration: float) -> dict:
+        results = {}
+        for scenario in sorted(self.statuses):
+            samples = self.latencies[scenario]
+            results[scenario] = {
+                "requests": sum(self.statuses[scenario].values()),
+                "errors": self.errors[scenario],
+                "rps": len(samples) / duration,
+                **latency_summary(samples),
+                "statuses": {str(status): count for status, count in self.statuses[scenario].items()},
+            }
+        everything = [seconds for samples in self.latencies.values() for seconds in samples]
+        results["all"] = {
+            "requests": sum(result["requests"] for result in results.values()),
+            "errors": sum(self.errors.values()),
+            "rps": len(everything) / duration,
+            **latency_summary(everything),
+        }
+        return results
+
+
+async def _worker(client, scenarios, mix: dict, rng, run: LoadRun, measure_from: float, deadline: float):
+    names, weights = list(mix), list(mix.values())
+    while True:
+        scenario = rng.choices(names, weights)[0]
+        method, path, kwargs = getattr(scenarios, scenario)(rng)
+        started_at = time.perf_counter()
+        if started_at >= deadline:
+            return
+        try:
+            response = await client.request(method, path, **kwargs)
+            await response.aread()
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        finished_at = time.perf_counter()
+        # Warmup requests fill caches and pools; they are not part of the result
+        if started_at >= measure_from:
+            run.record(scenario, finished_at - started_at, status)
+
+
+async def run_load(base_url: str, mix: dict, concurrency: int, duration: float, warmup: float,
+                   users: int, logins: int, seed: int = 42, timeout: float = 30.0) -> dict:
+    """
+    Drive the API at `base_url` with `concurrency` workers for `warmup` + `duration` seconds.
+
+    Each worker keeps one request in flight at a time (a closed loop), so the
+    throughput reported is what the API sustains at that concurrency.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        sessions = []
+        if "calculation" in mix:
+            sessions = await login_sessions(client, users, logins, random.Random(seed))
+        scenarios = Scenarios(users, sessions)
+
+        run = LoadRun()
+        measure_from = time.perf_counter() + warmup
+        deadline = measure_from + duration
+        await asyncio.gather(*(
+            _worker(client, scenarios, mix, random.Random(seed + worker), run, measure_from, deadline)
+            for worker in range(concurrency)
+        ))
+    return run.summary(duration)
+
+
+def parse_mix(text: str) -> dict:
+    """Parse "sp500=4,forum=1" (or just "sp500,forum" for equal weights) into a mix."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = item.partition("=")
+        if not hasattr(Scenarios, name) or name.startswith("_"):
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight) if weight else 1.0
+    if not mix:
+        raise ValueError("The mix names no scenario")
+    return mix
+
+
+def format_load(results: dict) -> str:
+    lines = [f"  {'scenario':<14} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for scenario, numbers in results.items():
+        if numbers["p50_ms"] is None:
+            lines.append(f"  {scenario:<14} {numbers['requests']:>9} {numbers['errors']:>7}   (no successful requests)")
+            continue
+        lines.append(
+            f"  {scenario:<14} {numbers['requests']:>9} {numbers['errors']:>7} {numbers['rps']:>9.1f} "
+            f"{numbers['p50_ms']:>9.1f} {numbers['p95_ms']:>9.1f} {numbers['p99_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
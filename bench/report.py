@@ -0,0 +1,93 @@
+# bench/report.py
+# Percentiles, JSON results and comparison against a saved baseline
+
+import json
+import math
+import platform
+from datetime import datetime, timezone
+
+# Result fields where a lower value is better; every other compared field is better higher
+LOWER_IS_BETTER = {"p50_ms", "p95_ms", "p99_ms", "mean_ms", "best_us", "median_us"}
+
+# Fields compared against the baseline, per benchmark
+COMPARED_FIELDS = {
+    "load": ["p50_ms", "p95_ms", "p99_ms", "rps"],
+    "scoring": ["median_us", "rows_per_second"],
+}
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile `q` (0-100) of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(seconds: list) -> dict:
+    """Mean / p50 / p95 / p99 / max of latency samples, in milliseconds."""
+    values = sorted(seconds)
+    if not values:
+        return {"mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    return {
+        "mean_ms": 1000 * sum(values) / len(values),
+        "p50_ms": 1000 * percentile(values, 50),
+        "p95_ms": 1000 * percentile(values, 95),
+        "p99_ms": 1000 * percentile(values, 99),
+        "max_ms": 1000 * values[-1],
+    }
+
+
+def result(benchmark: str, config: dict, results: dict) -> dict:
+    """A result document: what ran, where, with which settings, and the numbers per case."""
+    return {
+        "benchmark": benchmark,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+
+def write_result(path: str, document: dict):
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def load_result(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current: dict, baseline: dict, tolerance: float = None):
+    """
+    Lines comparing `current` with `baseline`, and whether anything regressed.
+
+    A case regresses when one of its compared fields is worse than the
+    baseline by more than `tolerance` percent; without a tolerance nothing
+    counts as a regression and the lines are informational only.
+    """
+    fields = COMPARED_FIELDS.get(current["benchmark"], [])
+    lines = [f"Compared with the baseline recorded at {baseline.get('recorded_at', '?')}:"]
+    regressed = False
+    for case, numbers in current["results"].items():
+        before = baseline["results"].get(case)
+        if before is None:
+            lines.append(f"  {case:<24} (not in baseline)")
+            continue
+        changes = []
+        for field in fields:
+            old, new = before.get(field), numbers.get(field)
+            if not old or new is None:
+                continue
+            change = 100 * (new - old) / old
+            worse = change > 0 if field in LOWER_IS_BETTER else change < 0
+            flag = ""
+            if tolerance is not None and worse and abs(change) > tolerance:
+                flag = " !"
+                regressed = True
+            changes.append(f"{field} {change:+6.1f}%{flag}")
+        lines.append(f"  {case:<24} " + "  ".join(changes))
+    return lines, regressed
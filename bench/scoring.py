@@ -0,0 +1,105 @@
+# bench/scoring.py
+# Micro-benchmarks of the scoring model in ingestion/scoring.py on synthetic fundamentals
+
+import statistics
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from ingestion.scoring import FUNDAMENTAL_FIELDS, compute_metrics, extract_fundamentals, score, score_metrics, score_one
+
+# Universe sizes the vectorized functions are timed at
+DEFAULT_SIZES = [1, 100, 1_000, 100_000]
+
+# Statement lines extract_fundamentals reads, with the column it reads them from
+FINANCIAL_LINES = ["Total Revenue", "Cost Of Revenue", "Net Income", "Selling General And Administration", "Operating Income"]
+BALANCE_SHEET_LINES = [
+    "Stockholders Equity", "Total Debt", "Total Assets", "Total Liabilities Net Minority Interest",
+    "Cash And Cash Equivalents", "Current Liabilities", "Current Assets", "Inventory",
+]
+
+
+def synthetic_fundamentals(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Raw fundamentals for `rows` made-up companies, with a few missing values like a real load."""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        rng.lognormal(mean=20, sigma=2, size=(rows, len(FUNDAMENTAL_FIELDS))),
+        columns=FUNDAMENTAL_FIELDS, index=[f"T{i:06d}" for i in range(rows)],
+    )
+    frame["tax_rate"] = rng.uniform(0, 0.35, rows)
+    frame["growth_rate"] = rng.uniform(0, 15, rows)
+    frame["corporate_bond_yield"] = 4.6
+    frame["earnings_per_share"] = rng.normal(5, 5, rows)
+    frame["stock_price"] = rng.uniform(1, 1000, rows)
+    frame["quick_ratio"] = rng.uniform(0, 4, rows)
+    frame["roa"] = rng.normal(5, 10, rows)
+    frame = frame.mask(rng.random(frame.shape) < 0.02)
+    return frame
+
+
+def synthetic_statements(seed: int = 42):
+    """One ticker's financials, balance sheet and info, shaped like the yfinance payloads."""
+    rng = np.random.default_rng(seed)
+    periods = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31", "2021-12-31"])
+    financials = pd.DataFrame(rng.lognormal(20, 2, (len(FINANCIAL_LINES), len(periods))), index=FINANCIAL_LINES, columns=periods)
+    balance_sheet = pd.DataFrame(rng.lognormal(20, 2, (len(BALANCE_SHEET_LINES), len(periods))), index=BALANCE_SHEET_LINES, columns=periods)
+    info = {
+        "effectiveTaxRate": float(rng.uniform(0, 0.35)),
+        "trailingEps": float(rng.normal(5, 5)),
+        "currentPrice": float(rng.uniform(1, 1000)),
+    }
+    return financials, balance_sheet, info
+
+
+def _time(func, repeat: int) -> dict:
+    """Best and median seconds per call over `repeat` timeit rounds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    rounds = [seconds / number for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {"calls": number * repeat, "best": min(rounds), "median": statistics.median(rounds)}
+
+
+def run_scoring(sizes=DEFAULT_SIZES, repeat: int = 5, seed: int = 42) -> dict:
+    """
+    Time every entry point of the scoring model; returns results per case.
+
+    Vectorized functions are timed at each of `sizes`; the per-ticker paths
+    (extract_fundamentals, score_one) once per call, as the loaders use them.
+    """
+    cases = []
+    for rows in sizes:
+        fundamentals = synthetic_fundamentals(rows, seed)
+        metrics = compute_metrics(fundamentals)
+        cases += [
+            (f"compute_metrics[{rows}]", rows, lambda data=fundamentals: compute_metrics(data)),
+            (f"score_metrics[{rows}]", rows, lambda data=metrics: score_metrics(data)),
+            (f"score[{rows}]", rows, lambda data=fundamentals: score(data)),
+        ]
+    record = synthetic_fundamentals(1, seed).iloc[0].to_dict()
+    financials, balance_sheet, info = synthetic_statements(seed)
+    cases += [
+        ("score_one", 1, lambda: score_one(record)),
+        ("extract_fundamentals", 1, lambda: extract_fundamentals(financials, balance_sheet, info)),
+    ]
+
+    results = {}
+    for name, rows, func in cases:
+        timing = _time(func, repeat)
+        results[name] = {
+            "rows": rows,
+            "calls": timing["calls"],
+            "best_us": 1e6 * timing["best"],
+            "median_us": 1e6 * timing["median"],
+            "rows_per_second": rows / timing["median"],
+        }
+    return results
+
+
+def format_scoring(results: dict) -> str:
+    lines = [f"  {'case':<26} {'best us':>12} {'median us':>12} {'rows/s':>14}"]
+    for name, numbers in results.items():
+        lines.append(
+            f"  {name:<26} {numbers['best_us']:>12.1f} {numbers['median_us']:>12.1f} {numbers['rows_per_second']:>14,.0f}"
+        )
+    return "\n".join(lines)
@@ -1,25 +1,80 @@
 #app.py
-from fastapi import FastAPI
-from database import connect_db, disconnect_db
+import logging
+import os
+from fastapi import FastAPI, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from database import connect_db, disconnect_db, ensure_calculation_indexes, ensure_forum_indexes, pool_stats
+from response_cache import index_cache, on_load, start_cache_listener, stop_cache_listener
+from search import company_index
+from http_cache import COMPRESS_MIN_SIZE
+from passwords import password_pool
+from metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, metrics_body, register_stats, start_loop_monitor, stop_loop_monitor
 from routes.users import router as users_router
 from routes.sp500 import router as sp500_router  # Import the SP500 router
 from routes.Nasdaq100 import router as nasdaq100_router  # Import the Nasdaq100 router
 from routes.Calculator import router as calculator_router  
 from routes.forum import router as forum_router  
+from routes.companies import router as companies_router
+from routes.rankings import router as rankings_router
+from routes.exports import router as exports_router
+from routes.search import router as search_router
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 app = FastAPI()
 
+# Compress the other large JSON bodies; the index and forum listings come precompressed
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+# Added last so it runs outermost and times compression too
+app.add_middleware(MetricsMiddleware)
+
 # Include the routers with the specified prefixes
 app.include_router(users_router, prefix="/api")
 app.include_router(sp500_router, prefix="/api")  # Include SP500 router
 app.include_router(nasdaq100_router, prefix="/api")  # Include Nasdaq100 router
 app.include_router(calculator_router, prefix="/api")  # Include Nasdaq100 router
 app.include_router(forum_router, prefix="/api") 
+app.include_router(companies_router, prefix="/api")
+app.include_router(rankings_router, prefix="/api")
+app.include_router(exports_router, prefix="/api")
+app.include_router(search_router, prefix="/api")
+
+# Rebuild the company search index after every load, like the response cache
+on_load(company_index.invalidate)
+
+def response_cache_stats() -> dict:
+    return {"enabled": index_cache.enabled, "entries": len(index_cache.entries),
+            "hits": index_cache.hits, "misses": index_cache.misses}
+
+# Pool and cache state, read on every scrape of /metrics
+register_stats("vis_db_pool", pool_stats, counters=["checkouts", "timeouts"], description="Database pool")
+register_stats("vis_password_pool", password_pool.stats, counters=["completed", "rejected"], description="Password hashing pool")
+register_stats("vis_response_cache", response_cache_stats, counters=["hits", "misses"], description="Index response cache")
+
+# Connection pool and response cache counters
+@app.get("/api/stats")
+async def read_stats():
+    return {
+        "db_pool": pool_stats(),
+        "response_cache": response_cache_stats(),
+    }
+
+# Prometheus scrape endpoint: route latency, query timings, pool saturation, event loop lag
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    return Response(content=metrics_body(), media_type=CONTENT_TYPE_LATEST)
 
 @app.on_event("startup")
 async def startup():
     await connect_db()  # Connect to the database
+    await ensure_forum_indexes()
+    await ensure_calculation_indexes()
+    await start_cache_listener()  # Drop cached index responses when a load finishes
+    start_loop_monitor()
 
 @app.on_event("shutdown")
 async def shutdown():
+    await stop_loop_monitor()
+    await stop_cache_listener()
     await disconnect_db()  # Disconnect from the database
+    password_pool.shutdown()
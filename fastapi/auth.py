@@ -0,0 +1,100 @@
+# auth.py
+# Signed stateless session tokens, issued on login and checked per request without a database hit
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request
+
+# Without a configured secret, tokens only survive until the API restarts
+AUTH_SECRET = os.environ.get("AUTH_SECRET", "").encode() or secrets.token_bytes(32)
+
+# Seconds a token stays valid after login
+TOKEN_TTL = int(os.environ.get("AUTH_TOKEN_TTL", 12 * 3600))
+
+# Cookie carrying the token for the browser, next to the Authorization header for other clients
+SESSION_COOKIE = "vis_session"
+
+
+@dataclass
+class SessionUser:
+    user_id: int
+    is_admin: bool
+    expires_at: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(AUTH_SECRET, payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user_id: int, is_admin: bool):
+    """
+    Token of `user_id` and its expiry time.
+
+    The token is base64url(JSON claims) + "." + base64url(HMAC-SHA256 of them).
+    """
+    expires_at = int(time.time()) + TOKEN_TTL
+    claims = {"sub": user_id, "adm": is_admin, "exp": expires_at}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}", expires_at
+
+
+def read_token(token: str) -> Optional[SessionUser]:
+    """The user a token was issued to, or None if it is forged, malformed or expired."""
+    payload, _, signature = token.partition(".")
+    # Compare bytes: compare_digest rejects str with non-ASCII characters,
+    # which any client can put in a header or cookie
+    try:
+        valid = hmac.compare_digest(signature.encode(), _sign(payload).encode())
+    except UnicodeEncodeError:
+        return None
+    if not valid:
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+        user = SessionUser(int(claims["sub"]), bool(claims["adm"]), int(claims["exp"]))
+    except (ValueError, KeyError, TypeError):
+        return None
+    if user.expires_at < time.time():
+        return None
+    return user
+
+
+def current_user(request: Request) -> SessionUser:
+    """Dependency: the logged in user, from `Authorization: Bearer` or the session cookie."""
+    token = request.cookies.get(SESSION_COOKIE)
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        token = credentials
+    user = read_token(token) if token else None
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not logged in", headers={"WWW-Authenticate": "Bearer"})
+    return user
+
+
+def require_admin(user: SessionUser = Depends(current_user)) -> SessionUser:
+    """Dependency: the logged in user, who must be an admin."""
+    if not user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return user
+
+
+def authorize(user: SessionUser, user_id: int):
+    """Allow acting on `user_id`'s data only for that user or an admin."""
+    if user.user_id != user_id and not user.is_admin:
+        raise HTTPException(status_code=403, detail="Not allowed")
@@ -1,14 +1,80 @@
 from databases import Database
+import asyncio
+import logging
+import os
+import sys
+import time
 import bcrypt
+from metrics import POOL_WAIT_SECONDS, time_query
+from serialization import sql_float
 
-POSTGRES_USER = "temp"
-POSTGRES_PASSWORD = "temp"
-POSTGRES_DB = "advcompro"
-POSTGRES_HOST = "db"
+logger = logging.getLogger(__name__)
 
-DATABASE_URL = f'postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}/{POSTGRES_DB}'
+POSTGRES_USER = os.environ.get("POSTGRES_USER", "temp")
+POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD", "temp")
+POSTGRES_DB = os.environ.get("POSTGRES_DB", "advcompro")
+POSTGRES_HOST = os.environ.get("POSTGRES_HOST", "db")
 
-database = Database(DATABASE_URL)
+# Plain asyncpg DSN, also used by the dedicated LISTEN connection (see response_cache.py)
+LISTEN_DSN = os.environ.get("DATABASE_DSN", f'postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}/{POSTGRES_DB}')
+DATABASE_URL = LISTEN_DSN.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+# Pool sizing and timeouts (seconds), passed through to asyncpg.create_pool
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))  # Waiting for a free connection
+DB_CONNECT_TIMEOUT = float(os.environ.get("DB_CONNECT_TIMEOUT", 10))
+DB_COMMAND_TIMEOUT = float(os.environ.get("DB_COMMAND_TIMEOUT", 30))
+# Prepared statements asyncpg keeps per connection; 0 disables them (e.g. behind pgbouncer)
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 256))
+
+# Rows fetched per round trip of an export's server-side cursor
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+
+# Functions that only pass a query on; the metric label is the function that called them
+QUERY_WRAPPERS = {
+    "fetch_all", "fetch_one", "fetch_val", "execute", "execute_many",
+    "fetch_prepared", "fetch_one_prepared", "stream_prepared",
+}
+
+def query_name() -> str:
+    """Name of the function a query is run for, e.g. get_user_by_id."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_name in QUERY_WRAPPERS:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else "unknown"
+
+class TimedDatabase(Database):
+    """Database that times every query under the name of the function running it (see metrics.py)."""
+
+    async def fetch_all(self, query, values=None):
+        with time_query(query_name(), query):
+            return await super().fetch_all(query, values)
+
+    async def fetch_one(self, query, values=None):
+        with time_query(query_name(), query):
+            return await super().fetch_one(query, values)
+
+    async def fetch_val(self, query, values=None, column=0):
+        with time_query(query_name(), query):
+            return await super().fetch_val(query, values, column)
+
+    async def execute(self, query, values=None):
+        with time_query(query_name(), query):
+            return await super().execute(query, values)
+
+    async def execute_many(self, query, values):
+        with time_query(query_name(), query):
+            return await super().execute_many(query, values)
+
+database = TimedDatabase(
+    DATABASE_URL,
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    timeout=DB_CONNECT_TIMEOUT,
+    command_timeout=DB_COMMAND_TIMEOUT,
+    statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+)
 
 # Function to hash the plain password
 def hash_password(plain_password: str) -> str:
@@ -20,13 +86,108 @@ def hash_password(plain_password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
+class InstrumentedPool:
+    """
+    Wraps the asyncpg pool behind `database` to count checkouts and time the
+    wait for a free connection. Everything else is passed through.
+    """
+
+    def __init__(self, pool, timeout: float = DB_POOL_TIMEOUT):
+        self.pool = pool
+        self.timeout = timeout
+        self.checkouts = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def acquire(self, timeout: float = None):
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        started_at = time.perf_counter()
+        try:
+            connection = await self.pool.acquire(timeout=timeout or self.timeout)
+        except asyncio.TimeoutError:  # Not the builtin TimeoutError before Python 3.11
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - started_at
+        self.checkouts += 1
+        self.in_use += 1
+        self.wait_seconds += waited
+        POOL_WAIT_SECONDS.observe(waited)
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return connection
+
+    async def release(self, connection, *args, **kwargs):
+        self.in_use -= 1
+        return await self.pool.release(connection, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.pool.get_size(),
+            "idle": self.pool.get_idle_size(),
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": 1000 * self.wait_seconds / self.checkouts if self.checkouts else 0.0,
+            "max_wait_ms": 1000 * self.max_wait_seconds,
+        }
+
 async def connect_db():
     await database.connect()
-    print("Database connected")
+    # databases keeps its asyncpg pool on the backend; swap in the instrumented wrapper
+    database._backend._pool = InstrumentedPool(database._backend._pool)
+    logger.info("Database connected")
+
+def pool_stats() -> dict:
+    pool = database._backend._pool
+    if not isinstance(pool, InstrumentedPool):
+        return {}
+    return pool.stats()
+
+# Hot queries skip SQLAlchemy and run on the raw asyncpg connection with
+# positional $n parameters. asyncpg prepares each distinct query text once per
+# connection and reuses the plan from its statement cache afterwards.
+async def fetch_prepared(query: str, *args):
+    with time_query(query_name(), query):
+        async with database.connection() as connection:
+            return await connection.raw_connection.fetch(query, *args)
+
+async def fetch_one_prepared(query: str, *args):
+    with time_query(query_name(), query):
+        async with database.connection() as connection:
+            return await connection.raw_connection.fetchrow(query, *args)
+
+# Exports read through a server-side cursor in a read-only, repeatable-read
+# transaction: one consistent snapshot, and only one batch of rows in memory.
+# The connection stays checked out until the generator is exhausted or closed.
+# Each batch fetch is timed under `name`.
+async def stream_prepared(query: str, *args, name: str = "stream_prepared", batch_size: int = EXPORT_BATCH_SIZE):
+    async with database.connection() as connection:
+        raw_connection = connection.raw_connection
+        async with raw_connection.transaction(isolation="repeatable_read", readonly=True):
+            cursor = await raw_connection.cursor(query, *args)
+            while True:
+                with time_query(name, query):
+                    batch = await cursor.fetch(batch_size)
+                if not batch:
+                    break
+                yield batch
 
 async def disconnect_db():
     await database.disconnect()
-    print("Database disconnected")
+    logger.info("Database disconnected")
 
 # User-related functions
 async def insert_user(username: str, password_hash: str, email: str, status: int = 0):
@@ -43,19 +204,17 @@ async def get_user(username: str):
     return await database.fetch_one(query=query, values={"username": username})
 
 async def get_user_by_id(user_id: int):
-    query = "SELECT * FROM users WHERE user_id = :user_id"
-    return await database.fetch_one(query=query, values={"user_id": user_id})
+    return await fetch_one_prepared("SELECT * FROM users WHERE user_id = $1", user_id)
 
 async def get_user_by_email(email: str):
-    query = "SELECT * FROM users WHERE email = :email"
-    return await database.fetch_one(query=query, values={"email": email})
+    return await fetch_one_prepared("SELECT * FROM users WHERE email = $1", email)
 
 async def update_user(user_id: int, username: str, password_hash: str, email: str):
     query = """
     UPDATE users
-    SET username = :username, password_hash = :password_hash, email = :email
+    SET username = :username, password_hash = COALESCE(:password_hash, password_hash), email = :email
     WHERE user_id = :user_id
-    RETURNING user_id, username, password_hash, email, created_at, status
+    RETURNING user_id, username, email, created_at, status
     """
     values = {"user_id": user_id, "username": username, "password_hash": password_hash, "email": email}
     return await database.fetch_one(query=query, values=values)
@@ -64,15 +223,164 @@ async def delete_user(user_id: int):
     query = "DELETE FROM users WHERE user_id = :user_id RETURNING *"
     return await database.fetch_one(query=query, values={"user_id": user_id})
 
-# Function to select all in indexfunds
+# Function to select the latest snapshot of every company in indexfunds
+# (the *_latest views are maintained by the loaders, see ingestion/schema.py)
 async def get_all_sp500():
-    query = "SELECT * FROM SP500"
+    query = "SELECT * FROM SP500_latest"
     return await database.fetch_all(query)
 
 async def get_all_Nasdaq100():
-    query = "SELECT * FROM Nasdaq100"
+    query = "SELECT * FROM Nasdaq100_latest"
     return await database.fetch_all(query)
 
+# Filtered, sorted and paginated select over an index latest view.
+# `columns` are select expressions (see screener.select_list); filter and sort
+# column names and the `after` cursor must already be validated (see screener.py); values are bound.
+# `companies`, when given, restricts the rows to those tickers.
+# The query text only depends on the shape of the request, so each shape is
+# prepared once per connection and reused.
+async def screen_index(view: str, columns: list, filters: list, order_by: str = "company",
+                       descending: bool = False, limit: int = None, offset: int = 0, after=None, companies: list = None):
+    conditions = []
+    args = []
+
+    def bind(value):
+        args.append(value)
+        return f"${len(args)}"
+
+    for column, operator, value in filters:
+        conditions.append(f"{column} {operator} {bind(value)}")
+    if companies:
+        conditions.append(f"company = ANY({bind(list(companies))}::text[])")
+
+    # Keyset pagination: continue after the (order_by value, company) of the last row seen
+    if after is not None:
+        after_value, after_company = after
+        if order_by == "company":
+            conditions.append(f"company {'<' if descending else '>'} {bind(after_company)}")
+        elif after_value is None:
+            # NULLs sort last, so only the remaining NULL rows are left
+            conditions.append(f"({order_by} IS NULL AND company > {bind(after_company)})")
+        else:
+            value = bind(after_value)
+            operator = "<" if descending else ">"
+            conditions.append(
+                f"({order_by} {operator} {value}"
+                f" OR ({order_by} = {value} AND company > {bind(after_company)})"
+                f" OR {order_by} IS NULL)"
+            )
+
+    query = f"SELECT {', '.join(columns)} FROM {view}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    direction = "DESC" if descending else "ASC"
+    # Sort on the stored column (qualified, not the float8 output alias) so the index applies
+    if order_by == "company":
+        query += f" ORDER BY {view}.company {direction}"
+    else:
+        query += f" ORDER BY {view}.{order_by} {direction} NULLS LAST, {view}.company ASC"
+    if limit is not None:
+        query += f" LIMIT {bind(limit)}"
+    if offset:
+        query += f" OFFSET {bind(offset)}"
+    return await fetch_prepared(query, *args)
+
+# Top `top` companies of one metric from an index rankings view (see ingestion/schema.py).
+# Reads the (metric, rank) index of the materialized view, so no sort runs per request.
+async def get_rankings(view: str, metric: str, top: int):
+    query = f"""
+    SELECT company, as_of, {sql_float('value')}, rank, percentile, ranked
+    FROM {view}
+    WHERE metric = $1
+    ORDER BY rank, company
+    LIMIT $2
+    """
+    return await fetch_prepared(query, metric, top)
+
+# Snapshots of one company from the history table (see ingestion/schema.py), oldest first.
+# `columns` are select expressions; with `bucket` ('week', 'month', ...) only the
+# last snapshot of each bucket is kept.
+async def get_company_history(company: str, columns: list, start=None, end=None, index_name: str = None,
+                              bucket: str = None):
+    conditions = ["company = $1"]
+    args = [company]
+    if start is not None:
+        args.append(start)
+        conditions.append(f"as_of >= ${len(args)}")
+    if end is not None:
+        args.append(end)
+        conditions.append(f"as_of <= ${len(args)}")
+    if index_name is not None:
+        args.append(index_name)
+        conditions.append(f"lower(index_name) = lower(${len(args)})")
+    select = ", ".join(["index_name", "as_of"] + columns)
+    where = " AND ".join(conditions)
+    if bucket is None:
+        query = f"SELECT {select} FROM index_snapshot WHERE {where} ORDER BY index_name, as_of"
+    else:
+        query = f"""
+        SELECT DISTINCT ON (index_name, date_trunc('{bucket}', as_of)) {select}
+        FROM index_snapshot
+        WHERE {where}
+        ORDER BY index_name, date_trunc('{bucket}', as_of), as_of DESC
+        """
+    return await fetch_prepared(query, *args)
+
+# Every row of an index latest view, for export
+def stream_index(view: str, columns: list):
+    return stream_prepared(f"SELECT {', '.join(columns)} FROM {view} ORDER BY company", name="stream_index")
+
+# Every stored snapshot of one index, optionally bounded by as_of, for export
+def stream_index_history(index_name: str, columns: list, start=None, end=None):
+    conditions = ["lower(index_name) = lower($1)"]
+    args = [index_name]
+    if start is not None:
+        args.append(start)
+        conditions.append(f"as_of >= ${len(args)}")
+    if end is not None:
+        args.append(end)
+        conditions.append(f"as_of <= ${len(args)}")
+    query = f"""
+    SELECT as_of, {', '.join(columns)}
+    FROM index_snapshot
+    WHERE {' AND '.join(conditions)}
+    ORDER BY as_of, company
+    """
+    return stream_prepared(query, *args, name="stream_index_history")
+
+# Data version of an index table, bumped by every load (see ingestion/schema.py).
+# None until the loader has run against this database.
+async def get_index_version(table: str):
+    query = "SELECT version, updated_at FROM index_version WHERE lower(table_name) = lower($1)"
+    try:
+        return await fetch_one_prepared(query, table)
+    except Exception as e:
+        logger.warning("Could not read the data version of %s: %s", table, e)
+        return None
+
+# Every company of the index tables with its name and the tables it is in, for the search index.
+# Names come from company_info (see ingestion/schema.py); without them tickers are still searchable.
+async def get_search_companies(tables: list):
+    companies = {}
+    for table in tables:
+        try:
+            rows = await fetch_prepared(f"SELECT company FROM {table}_latest")
+        except Exception as e:
+            logger.warning("Could not read the companies of %s: %s", table, e)
+            continue
+        for row in rows:
+            entry = companies.setdefault(row["company"], {"company": row["company"], "name": None, "indexes": []})
+            entry["indexes"].append(table)
+    try:
+        names = await fetch_prepared("SELECT company, name FROM company_info")
+    except Exception as e:
+        logger.warning("Could not read the company names: %s", e)
+        names = []
+    for row in names:
+        if row["company"] in companies:
+            companies[row["company"]]["name"] = row["name"]
+    return list(companies.values())
+
 # Functions for Calculation History
 
 async def insert_calculation_history(data: dict):
@@ -87,13 +395,119 @@ async def insert_calculation_history(data: dict):
     """
     return await database.fetch_one(query=query, values=data)
 
+# Columns of the calculation table filled from scored results
+CALCULATION_RESULT_FIELDS = [
+    "stock_price", "intrinsic_value", "margin_of_safety", "rating", "gross_profit_margin",
+    "return_on_equity", "roic", "sga_to_revenue", "debt_to_equity", "current_ratio",
+    "cash_ratio", "quick_ratio", "roa",
+]
+
+# Save many scored results of one user with a single INSERT ... SELECT FROM unnest().
+# `results` is a list of dicts with company_name plus CALCULATION_RESULT_FIELDS.
+async def insert_calculation_results(user_id: int, results: list):
+    columns = ", ".join(["company_name"] + CALCULATION_RESULT_FIELDS)
+    arrays = ", ".join(["CAST(:company_name AS text[])"] + [f"CAST(:{field} AS float8[])" for field in CALCULATION_RESULT_FIELDS])
+    query = f"""
+    INSERT INTO calculation (user_id, username, {columns})
+    SELECT users.user_id, users.username, scored.*
+    FROM users, unnest({arrays}) AS scored
+    WHERE users.user_id = :user_id
+    RETURNING history_id
+    """
+    values = {"user_id": user_id, "company_name": [result["company_name"] for result in results]}
+    for field in CALCULATION_RESULT_FIELDS:
+        values[field] = [result[field] for result in results]
+    return await database.fetch_all(query=query, values=values)
+
 async def get_calculation_history_by_user_id(user_id: int):
     query = "SELECT * FROM calculation WHERE user_id = :user_id"
     return await database.fetch_all(query=query, values={"user_id": user_id})
 
-async def delete_calculation_history(history_id: int):
-    query = "DELETE FROM calculation WHERE history_id = :history_id RETURNING *"
-    return await database.fetch_one(query=query, values={"history_id": history_id})
+# Columns a user's calculation history can be sorted on, each indexed after user_id
+CALCULATION_SORT_FIELDS = ["created_at", "company_name"] + CALCULATION_RESULT_FIELDS
+
+# One page of a user's calculation history, optionally searched by company name.
+# `after` is the (order_by value, history_id) of the last row of the previous
+# page. NULLs sort as Postgres orders them by default (last ascending, first
+# descending), so each (user_id, column, history_id) index serves both directions.
+async def get_calculation_history_page(user_id: int, search: str = None, order_by: str = "created_at",
+                                       descending: bool = True, limit: int = None, after=None):
+    conditions = ["user_id = $1"]
+    args = [user_id]
+
+    def bind(value):
+        args.append(value)
+        return f"${len(args)}"
+
+    if search:
+        # Substring match, answered by the trigram index; LIKE wildcards in the search are literal
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append(f"company_name ILIKE '%' || {bind(escaped)} || '%'")
+
+    if after is not None:
+        after_value, after_id = after
+        value = None if after_value is None else bind(after_value)
+        after_id = bind(after_id)
+        if value is None:
+            conditions.append(
+                f"({order_by} IS NOT NULL OR history_id < {after_id})" if descending
+                else f"({order_by} IS NULL AND history_id > {after_id})"
+            )
+        else:
+            if descending:
+                conditions.append(f"({order_by} < {value} OR ({order_by} = {value} AND history_id < {after_id}))")
+            else:
+                conditions.append(
+                    f"({order_by} > {value} OR ({order_by} = {value} AND history_id > {after_id}) OR {order_by} IS NULL)"
+                )
+
+    columns = ["history_id", "company_name"] + [sql_float(field) for field in CALCULATION_RESULT_FIELDS] + ["created_at"]
+    direction = "DESC" if descending else "ASC"
+    # Sort on the stored column (qualified, not the float8 output alias) so the index applies
+    query = f"""
+    SELECT {', '.join(columns)}
+    FROM calculation
+    WHERE {' AND '.join(conditions)}
+    ORDER BY calculation.{order_by} {direction}, calculation.history_id {direction}
+    """
+    if limit is not None:
+        query += f" LIMIT {bind(limit)}"
+    return await fetch_prepared(query, *args)
+
+# Indexes behind the history pages: one per sort column, plus trigram search on company_name
+async def ensure_calculation_indexes():
+    try:
+        for field in CALCULATION_SORT_FIELDS:
+            await database.execute(
+                f"CREATE INDEX IF NOT EXISTS calculation_user_id_{field}_idx ON calculation (user_id, {field}, history_id)"
+            )
+    except Exception as e:
+        logger.warning("Could not create the calculation history indexes: %s", e)
+    try:
+        await database.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        await database.execute(
+            "CREATE INDEX IF NOT EXISTS calculation_company_name_trgm_idx ON calculation USING gin (company_name gin_trgm_ops)"
+        )
+    except Exception as e:
+        logger.warning("Could not create the calculation search index (is pg_trgm available?): %s", e)
+
+# Columns of a calculation history export, in order
+CALCULATION_EXPORT_FIELDS = ["history_id", "company_name"] + CALCULATION_RESULT_FIELDS + ["created_at"]
+
+# A user's whole calculation history, oldest first, for export
+def stream_calculation_history(user_id: int):
+    columns = [sql_float(field) if field in CALCULATION_RESULT_FIELDS else field for field in CALCULATION_EXPORT_FIELDS]
+    query = f"SELECT {', '.join(columns)} FROM calculation WHERE user_id = $1 ORDER BY created_at, history_id"
+    return stream_prepared(query, user_id, name="stream_calculation_history")
+
+# Passing owner_id only deletes the record if it belongs to that user
+async def delete_calculation_history(history_id: int, owner_id: int = None):
+    query = "DELETE FROM calculation WHERE history_id = :history_id"
+    values = {"history_id": history_id}
+    if owner_id is not None:
+        query += " AND user_id = :owner_id"
+        values["owner_id"] = owner_id
+    return await database.fetch_one(query=query + " RETURNING *", values=values)
 
 # Functions for Forum
 async def insert_forum_post(user_id: int, title: str, content: str):
@@ -115,27 +529,115 @@ async def get_latest_forum_posts():
     return await database.fetch_all(query)
 
 # Update a forum post
-async def update_forum_post(forum_id: int, title: str, content: str):
-    query = """
+# (passing owner_id only updates the post if that user wrote it)
+async def update_forum_post(forum_id: int, title: str, content: str, owner_id: int = None):
+    values = {"forum_id": forum_id, "title": title, "content": content}
+    owner = ""
+    if owner_id is not None:
+        owner = "AND user_id = :owner_id"
+        values["owner_id"] = owner_id
+    query = f"""
     UPDATE forumPost 
     SET title = :title, content = :content 
-    WHERE forum_id = :forum_id
+    WHERE forum_id = :forum_id {owner}
     RETURNING forum_id, user_id, title, content, created_at
     """
-    values = {"forum_id": forum_id, "title": title, "content": content}
     return await database.fetch_one(query=query, values=values)
 
 # Delete a forum post
-async def delete_forum_post(forum_id: int):
+async def delete_forum_post(forum_id: int, owner_id: int = None):
+    query = "DELETE FROM forumPost WHERE forum_id = :forum_id"
+    values = {"forum_id": forum_id}
+    if owner_id is not None:
+        query += " AND user_id = :owner_id"
+        values["owner_id"] = owner_id
+    query += " RETURNING *"
+    return await database.fetch_one(query=query, values=values)
+
+# Newest-first page of the forum with each post's reply count.
+# `after` is the (created_at, forum_id) of the last post already seen.
+async def get_forum_feed(limit: int, after=None):
+    args = [limit]
+    condition = ""
+    if after is not None:
+        condition = "WHERE (forumPost.created_at, forumPost.forum_id) < ($2, $3)"
+        args.extend(after)
+    query = f"""
+    SELECT forumPost.forum_id, forumPost.user_id, forumPost.title, forumPost.content, forumPost.created_at, users.username,
+           (SELECT count(*) FROM forumReply WHERE forumReply.forum_id = forumPost.forum_id) AS reply_count
+    FROM forumPost
+    JOIN users ON forumPost.user_id = users.user_id
+    {condition}
+    ORDER BY forumPost.created_at DESC, forumPost.forum_id DESC
+    LIMIT $1
+    """
+    return await fetch_prepared(query, *args)
+
+# Indexes behind the forum feed and the batched reply lookup, and the forum version row
+async def ensure_forum_indexes():
+    try:
+        await database.execute("CREATE INDEX IF NOT EXISTS forumpost_created_at_idx ON forumPost (created_at DESC, forum_id DESC)")
+        await database.execute("CREATE INDEX IF NOT EXISTS forumreply_forum_id_created_at_idx ON forumReply (forum_id, created_at)")
+    except Exception as e:
+        logger.warning("Could not create the forum indexes: %s", e)
+    try:
+        await database.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        await database.execute("CREATE INDEX IF NOT EXISTS forumpost_title_trgm_idx ON forumPost USING gin (title gin_trgm_ops)")
+        await database.execute("CREATE INDEX IF NOT EXISTS forumpost_content_trgm_idx ON forumPost USING gin (content gin_trgm_ops)")
+    except Exception as e:
+        logger.warning("Could not create the forum search indexes (is pg_trgm available?): %s", e)
+    # One row bumped by triggers on every change to posts, replies or usernames,
+    # whichever process makes it; the listings take their validators from it
+    try:
+        await database.execute("""
+        CREATE TABLE IF NOT EXISTS forum_version (
+            id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+            version BIGINT NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """)
+        await database.execute("INSERT INTO forum_version (id, version) VALUES (true, 1) ON CONFLICT (id) DO NOTHING")
+        await database.execute("""
+        CREATE OR REPLACE FUNCTION bump_forum_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE forum_version SET version = version + 1, updated_at = clock_timestamp();
+            RETURN NULL;
+        END
+        $$
+        """)
+        for table, events in (("forumPost", "INSERT OR UPDATE OR DELETE"), ("forumReply", "INSERT OR UPDATE OR DELETE"),
+                              ("users", "UPDATE OF username OR DELETE")):
+            await database.execute(f"DROP TRIGGER IF EXISTS {table.lower()}_forum_version ON {table}")
+            await database.execute(
+                f"CREATE TRIGGER {table.lower()}_forum_version AFTER {events} ON {table} "
+                "FOR EACH STATEMENT EXECUTE FUNCTION bump_forum_version()"
+            )
+    except Exception as e:
+        logger.warning("Could not create the forum version triggers: %s", e)
+
+# Version of the forum data, bumped on every write (see ensure_forum_indexes).
+# None if the version row can't be read; the listings then fall back to body hashes.
+async def get_forum_version():
     try:
-        query = "DELETE FROM forumPost WHERE forum_id = :forum_id RETURNING *"
-        values = {"forum_id": forum_id}
-        result = await database.fetch_one(query=query, values=values)
-        print(f"Deleted forum post: {result}")  # Log the result of the delete operation
-        return result
+        return await fetch_one_prepared("SELECT version, updated_at FROM forum_version")
     except Exception as e:
-        print(f"Database error when deleting forum post {forum_id}: {str(e)}")
-        raise
+        logger.warning("Could not read the forum version: %s", e)
+        return None
+
+# Forum posts whose title or content contains `search`, or a word close to it (typos).
+# Both conditions are answered by the trigram indexes above; best title matches first.
+async def search_forum_posts(search: str, limit: int):
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    query = """
+    SELECT forum_id, user_id, title, left(content, 200) AS snippet, created_at,
+           word_similarity($1, title)::float8 AS score
+    FROM forumPost
+    WHERE title ILIKE '%' || $2 || '%' OR content ILIKE '%' || $2 || '%'
+       OR $1 <% title OR $1 <% content
+    ORDER BY score DESC, created_at DESC, forum_id DESC
+    LIMIT $3
+    """
+    return await fetch_prepared(query, search, escaped, limit)
 
 # Functions for Forum Replies
 async def insert_forum_reply(user_id: int, forum_id: int, content: str):
@@ -157,6 +659,21 @@ async def get_replies_for_post(forum_id: int):
     """
     return await database.fetch_all(query=query, values={"forum_id": forum_id})
 
-async def delete_forum_reply(reply_id: int):
-    query = "DELETE FROM forumReply WHERE reply_id = :reply_id RETURNING *"
-    return await database.fetch_one(query=query, values={"reply_id": reply_id})
+# Replies of several posts in one query, grouped by post and oldest first
+async def get_replies_for_posts(forum_ids: list):
+    query = """
+    SELECT forumReply.reply_id, forumReply.user_id, forumReply.forum_id, forumReply.content, forumReply.created_at, users.username
+    FROM forumReply
+    JOIN users ON forumReply.user_id = users.user_id
+    WHERE forumReply.forum_id = ANY($1::int[])
+    ORDER BY forumReply.forum_id, forumReply.created_at ASC
+    """
+    return await fetch_prepared(query, forum_ids)
+
+async def delete_forum_reply(reply_id: int, owner_id: int = None):
+    query = "DELETE FROM forumReply WHERE reply_id = :reply_id"
+    values = {"reply_id": reply_id}
+    if owner_id is not None:
+        query += " AND user_id = :owner_id"
+        values["owner_id"] = owner_id
+    return await database.fetch_one(query=query + " RETURNING *", values=values)
@@ -0,0 +1,92 @@
+# export.py
+# Streaming NDJSON / CSV / Arrow encoders for batches of database rows
+
+import csv
+import io
+from datetime import date, datetime
+
+from serialization import json_body
+
+try:
+    import pyarrow  # Optional: enables the Arrow IPC export format
+except ImportError:
+    pyarrow = None
+
+# Export formats we can produce: media type and file extension
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+if pyarrow is not None:
+    EXPORT_FORMATS["arrow"] = ("application/vnd.apache.arrow.stream", "arrows")
+
+
+async def ndjson_stream(batches, columns: list):
+    """One JSON object per line, one chunk per batch."""
+    async for batch in batches:
+        yield b"".join(json_body(dict(row)) + b"\n" for row in batch)
+
+
+def _csv_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def csv_stream(batches, columns: list):
+    """CSV with a header row of `columns`, sent even when there are no rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    async for batch in batches:
+        writer.writerows([_csv_value(row[name]) for name in columns] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _arrow_type(name: str):
+    if name in ("as_of",):
+        return pyarrow.date32()
+    if name in ("created_at",):
+        return pyarrow.timestamp("us", tz="UTC")
+    if name in ("history_id", "rank"):
+        return pyarrow.int64()
+    if name in ("company", "company_name", "index_name"):
+        return pyarrow.string()
+    return pyarrow.float64()
+
+
+async def arrow_stream(batches, columns: list):
+    """
+    Arrow IPC stream, one record batch per database batch.
+
+    The schema is fixed from `columns` and sent before the first batch, so a
+    column that starts out all NULL still gets its real type and an empty
+    export is still a valid stream.
+    """
+    sink = io.BytesIO()
+    schema = pyarrow.schema([(name, _arrow_type(name)) for name in columns])
+    writer = pyarrow.ipc.new_stream(sink, schema)
+    yield sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    async for batch in batches:
+        arrays = [[row[name] for row in batch] for name in columns]
+        writer.write_batch(pyarrow.record_batch(arrays, schema=schema))
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    writer.close()
+    yield sink.getvalue()
+
+
+ENCODERS = {"ndjson": ndjson_stream, "csv": csv_stream, "arrow": arrow_stream}
+
+
+def encode_stream(export_format: str, batches, columns: list):
+    """Byte chunks of `batches` (async iterable of row lists with `columns`) in `export_format`."""
+    return ENCODERS[export_format](batches, columns)
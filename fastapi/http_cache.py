@@ -0,0 +1,162 @@
+# http_cache.py
+# Conditional requests (ETag / Last-Modified -> 304) and precompressed JSON bodies
+
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Response
+
+try:
+    import brotli  # Optional: serve br to clients that accept it
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent as is; compressing them isn't worth the bytes
+COMPRESS_MIN_SIZE = 1024
+
+# Content codings we can produce, in order of preference
+CODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def _compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=9)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class CachedResponse:
+    """
+    A serialized JSON body plus its validators.
+
+    Compressed variants are built on first use and kept with the entry, so a
+    cached body is only ever compressed once per content coding.
+    """
+
+    def __init__(self, body: bytes, headers: dict = None, etag: str = None, last_modified: datetime = None):
+        self.body = body
+        self.headers = headers or {}
+        self.etag = etag or '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.last_modified = last_modified
+        self.encoded = {}
+
+    def encode(self, coding: str) -> bytes:
+        if coding not in self.encoded:
+            self.encoded[coding] = _compress(self.body, coding)
+        return self.encoded[coding]
+
+
+def version_etag(name: str, version: int, key: str) -> str:
+    """Strong ETag of the response to `key` at data version `version` of `name`."""
+    return f'"{name.lower()}-{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    # Each content coding is a different representation, so it gets its own strong tag
+    return etag if coding is None else etag[:-1] + f"-{coding}" + '"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def matching_etag(if_none_match: str, etag: str):
+    """
+    The tag of If-None-Match that matches `etag` in any of its content codings.
+
+    Uses the weak comparison If-None-Match calls for; returns None on no match.
+    """
+    if if_none_match.strip() == "*":
+        return etag
+    accepted = {coded_etag(etag, coding) for coding in [None] + CODINGS}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in accepted:
+            return candidate
+    return None
+
+
+def _modified_since(request, last_modified: datetime) -> bool:
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return True
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one second resolution
+    return last_modified.replace(microsecond=0) > since
+
+
+def revalidate(request, etag: str, last_modified: datetime = None, coding: str = None):
+    """
+    A 304 response if the client's copy is current, else None.
+
+    If-None-Match takes precedence over If-Modified-Since. `coding` is the
+    content coding a full response would use, for the ETag of the 304.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        matched = matching_etag(if_none_match, etag)
+        if matched is None:
+            return None
+        return _not_modified(matched, last_modified)
+    if _modified_since(request, last_modified):
+        return None
+    return _not_modified(coded_etag(etag, coding), last_modified)
+
+
+def negotiate_coding(request, size: int):
+    """Preferred content coding accepted by the client, or None to send the body as is."""
+    if size < COMPRESS_MIN_SIZE:
+        return None
+    accepted = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in CODINGS:
+        if accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def _not_modified(etag: str, last_modified: datetime = None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_response(request, entry: CachedResponse) -> Response:
+    """
+    Send `entry`, or a 304 if the client already has it.
+
+    Clients are asked to revalidate every time (no-cache), which costs them a
+    round trip but no body while the data version is unchanged.
+    """
+    coding = negotiate_coding(request, len(entry.body))
+    not_modified = revalidate(request, entry.etag, entry.last_modified, coding)
+    if not_modified is not None:
+        return not_modified
+    etag = coded_etag(entry.etag, coding)
+
+    headers = {**entry.headers, "ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if entry.last_modified is not None:
+        headers["Last-Modified"] = http_date(entry.last_modified)
+    body = entry.body
+    if coding is not None:
+        body = entry.encode(coding)
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,158 @@
+# metrics.py
+# Prometheus metrics: request latency per route, query timings, pool saturation and event loop lag
+
+import asyncio
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# Queries slower than this (seconds) are logged with their SQL
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_SECONDS", 0.5))
+
+# How often the event loop lag is sampled (seconds)
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", 0.5))
+
+REQUEST_SECONDS = Histogram(
+    "vis_http_request_duration_seconds", "Time from request to the last body byte, per route",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge("vis_http_requests_in_progress", "Requests being handled", ["method"])
+QUERY_SECONDS = Histogram("vis_db_query_duration_seconds", "Query time per database.py function", ["query"])
+QUERY_ERRORS = Counter("vis_db_query_errors_total", "Queries that raised, per database.py function", ["query"])
+POOL_WAIT_SECONDS = Histogram(
+    "vis_db_pool_wait_seconds", "Time spent waiting for a free pooled connection",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+LOOP_LAG_SECONDS = Histogram(
+    "vis_event_loop_lag_seconds", "How late the event loop woke a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+@contextmanager
+def time_query(name: str, sql: str):
+    """Time one query under `name`; log it with its SQL when slower than SLOW_QUERY_SECONDS."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        QUERY_ERRORS.labels(name).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - started_at
+        QUERY_SECONDS.labels(name).observe(elapsed)
+        if elapsed >= SLOW_QUERY_SECONDS:
+            # Only the statement: bound values may hold password hashes or emails
+            logger.warning("Slow query %s took %.0f ms: %s", name, 1000 * elapsed, re.sub(r"\s+", " ", str(sql)).strip()[:500])
+
+
+def route_template(scope) -> str:
+    """Path template of the route that handled a request, e.g. /api/users/{user_id}."""
+    # Newer FastAPI resolves included routers lazily and keeps the full path here
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every request under its route template.
+
+    Timing stops at the last body chunk, so streamed responses count in full.
+    Paths that match no route share one label to keep the series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = "500"
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            REQUEST_SECONDS.labels(method, route_template(scope), status).observe(time.perf_counter() - started_at)
+
+
+class StatsCollector:
+    """
+    Exposes a stats() dict (see database.pool_stats, PasswordPool.stats) at scrape time.
+
+    Keys in `counters` become `<prefix>_<key>_total` counters, every other
+    numeric key a `<prefix>_<key>` gauge.
+    """
+
+    def __init__(self, prefix: str, stats, counters=(), description: str = ""):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = set(counters)
+        self.description = description
+
+    def collect(self):
+        for key, value in self.stats().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            if key in self.counters:
+                yield CounterMetricFamily(name, f"{self.description} {key}", value=value)
+            else:
+                yield GaugeMetricFamily(name, f"{self.description} {key}", value=value)
+
+
+def register_stats(prefix: str, stats, counters=(), description: str = ""):
+    REGISTRY.register(StatsCollector(prefix, stats, counters, description))
+
+
+def metrics_body() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+# Event loop lag: a task asks to wake every LOOP_LAG_INTERVAL and records how late it was.
+# Anything that blocks the loop (CPU work, sync I/O) shows up here.
+_loop_monitor = None
+
+
+async def _watch_loop(interval: float):
+    while True:
+        started_at = time.perf_counter()
+        await asyncio.sleep(interval)
+        LOOP_LAG_SECONDS.observe(max(0.0, time.perf_counter() - started_at - interval))
+
+
+def start_loop_monitor(interval: float = LOOP_LAG_INTERVAL):
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = asyncio.get_running_loop().create_task(_watch_loop(interval))
+
+
+async def stop_loop_monitor():
+    global _loop_monitor
+    if _loop_monitor is not None:
+        _loop_monitor.cancel()
+        try:
+            await _loop_monitor
+        except asyncio.CancelledError:
+            pass
+        _loop_monitor = None
@@ -0,0 +1,84 @@
+# passwords.py
+# Bounded thread pool for bcrypt, so password work never blocks the event loop
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+# bcrypt releases the GIL, so threads hash in parallel up to this many at once
+PASSWORD_WORKERS = int(os.environ.get("PASSWORD_WORKERS", 4))
+
+# Requests allowed to queue for a worker; beyond this we answer 503 right away
+PASSWORD_MAX_WAITING = int(os.environ.get("PASSWORD_MAX_WAITING", 100))
+
+
+class PasswordPool:
+    """
+    Runs blocking password functions on a dedicated executor.
+
+    Admission is controlled on the event loop with a semaphore sized to the
+    executor, so the executor itself never queues and every counter below is
+    only touched from the loop thread.
+    """
+
+    def __init__(self, workers: int = PASSWORD_WORKERS, max_waiting: int = PASSWORD_MAX_WAITING):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.slots = None
+        self.running = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    async def run(self, func, *args):
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Too many logins in progress, try again shortly",
+                                headers={"Retry-After": "1"})
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.workers)
+
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        queued_at = time.perf_counter()
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.wait_seconds += started_at - queued_at
+
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.run_seconds += time.perf_counter() - started_at
+            self.slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_waiting": self.max_waiting,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": 1000 * self.wait_seconds / self.completed if self.completed else 0.0,
+            "avg_run_ms": 1000 * self.run_seconds / self.completed if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+password_pool = PasswordPool()
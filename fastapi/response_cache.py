@@ -0,0 +1,127 @@
+# response_cache.py
+# In-process cache of serialized index responses, invalidated when a load finishes
+
+import logging
+import os
+from collections import OrderedDict
+
+import asyncpg
+
+from database import LISTEN_DSN
+from http_cache import CachedResponse
+
+logger = logging.getLogger(__name__)
+
+# Channel the loaders NOTIFY on after committing a table (see ingestion/schema.py)
+LOAD_CHANNEL = "index_loaded"
+
+# Distinct responses (path + query string) kept across all index tables
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+
+
+class ResponseCache:
+    """
+    LRU of JSON bodies keyed by (table, request key).
+
+    The cache only serves entries while the LISTEN connection is up; without it
+    we could miss an invalidation, so every request goes to the database.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        # Bumped by every invalidation, so a response computed before a load can't be stored after it
+        self.epoch = 0
+        self.generations = {}
+        self.enabled = False
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table: str, key: str):
+        if not self.enabled:
+            return None
+        entry = self.entries.get((table, key))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end((table, key))
+        self.hits += 1
+        return entry
+
+    def generation(self, table: str) -> int:
+        return self.epoch + self.generations.get(table.lower(), 0)
+
+    def put(self, table: str, key: str, entry: CachedResponse, generation: int = None) -> CachedResponse:
+        """Store a response computed while generation(table) was `generation`."""
+        if self.enabled and (generation is None or generation == self.generation(table)):
+            self.entries[(table, key)] = entry
+            self.entries.move_to_end((table, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, table: str = None):
+        """Drop the entries of one table (case-insensitive), or everything."""
+        if table is None:
+            self.epoch += 1
+            self.entries.clear()
+            return
+        self.generations[table.lower()] = self.generation(table) + 1
+        for cached_table, key in list(self.entries):
+            if cached_table.lower() == table.lower():
+                del self.entries[(cached_table, key)]
+
+
+index_cache = ResponseCache()
+
+_listener = None
+
+# Other in-memory copies of the index data (e.g. the search index), told about loads like the cache
+_load_callbacks = []
+
+
+def on_load(callback):
+    """Call `callback(table)` after every load, and `callback(None)` when loads can no longer be heard."""
+    _load_callbacks.append(callback)
+
+
+def request_key(request) -> str:
+    """Cache key of a request: its path plus the sorted query string."""
+    return request.url.path + "?" + "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+
+
+def _on_load(connection, pid, channel, payload):
+    index_cache.invalidate(payload or None)
+    for callback in _load_callbacks:
+        callback(payload or None)
+
+
+def _on_lost(connection):
+    # Stop serving from the cache; we can no longer hear about loads
+    index_cache.enabled = False
+    index_cache.invalidate()
+    for callback in _load_callbacks:
+        callback(None)
+    logger.warning("Response cache disabled: lost the LISTEN connection")
+
+
+async def start_cache_listener():
+    global _listener
+    try:
+        _listener = await asyncpg.connect(LISTEN_DSN)
+        await _listener.add_listener(LOAD_CHANNEL, _on_load)
+        _listener.add_termination_listener(_on_lost)
+    except Exception as e:
+        logger.warning("Response cache disabled: could not LISTEN for loads: %s", e)
+        return
+    index_cache.enabled = True
+    logger.info("Response cache enabled")
+
+
+async def stop_cache_listener():
+    global _listener
+    index_cache.enabled = False
+    index_cache.invalidate()
+    if _listener is not None:
+        await _listener.close()
+        _listener = None
@@ -1,18 +1,30 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from auth import SessionUser, authorize, current_user
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 from datetime import datetime
+from decimal import Decimal
 from database import (
+    CALCULATION_SORT_FIELDS,
     insert_calculation_history,
-    get_calculation_history_by_user_id,
-    delete_calculation_history
+    get_calculation_history_page,
+    delete_calculation_history,
+    insert_calculation_results,
 )
+from ingestion.scoring import METRIC_FIELDS, score
+from screener import encode_cursor, decode_cursor
+from serialization import rows_body, sanitize_float
 from sqlalchemy import text
 import math
-from decimal import Decimal
 
 router = APIRouter()
 
+# Records accepted by one /calculation/evaluate request
+MAX_EVALUATE_RECORDS = 1000
+
+# Largest page of calculation history
+MAX_HISTORY_LIMIT = 500
+
 # Pydantic model for response
 class CalHistory(BaseModel):
     history_id: int
@@ -51,17 +63,81 @@ class CreateCalHistory(BaseModel):
     quick_ratio: Optional[float]
     roa: Optional[float]
 
-def sanitize_float(value):
-    """Sanitize float values to ensure they are JSON compliant."""
-    if isinstance(value, Decimal):
-        return float(value)
-    if isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
-        return None
-    return value
+# Raw fundamentals of one company, as read by the loaders' scoring model
+# (missing values are NaN; unknown tax / growth / bond rates use the model defaults)
+class Fundamentals(BaseModel):
+    company_name: str
+    revenue: Optional[float] = None
+    cost_of_goods_sold: Optional[float] = None
+    net_income: Optional[float] = None
+    share_holder_equity: Optional[float] = None
+    sga_and_a: Optional[float] = None
+    total_debt: Optional[float] = None
+    current_asset: Optional[float] = None
+    current_liability: Optional[float] = None
+    cash_and_cash_equivalents: Optional[float] = None
+    operating_income: Optional[float] = None
+    tax_rate: Optional[float] = None
+    total_assets: Optional[float] = None
+    current_liabilities: Optional[float] = None
+    earnings_per_share: Optional[float] = None
+    growth_rate: Optional[float] = None
+    corporate_bond_yield: Optional[float] = None
+    stock_price: Optional[float] = None
+    quick_ratio: Optional[float] = None
+    roa: Optional[float] = None
+
+class EvaluateRequest(BaseModel):
+    records: List[Fundamentals] = Field(..., min_length=1, max_length=MAX_EVALUATE_RECORDS)
+    save: bool = False  # Store the results in the caller's calculation history
+
+class EvaluatedRecord(BaseModel):
+    history_id: Optional[int] = None
+    company_name: str
+    stock_price: Optional[float]
+    intrinsic_value: Optional[float]
+    margin_of_safety: Optional[float]
+    rating: Optional[float]
+    quality: Optional[float]
+    gross_profit_margin: Optional[float]
+    return_on_equity: Optional[float]
+    roic: Optional[float]
+    sga_to_revenue: Optional[float]
+    debt_to_equity: Optional[float]
+    current_ratio: Optional[float]
+    cash_ratio: Optional[float]
+    quick_ratio: Optional[float]
+    roa: Optional[float]
+
+# Score many what-if records at once with the loaders' vectorized model
+@router.post("/calculation/evaluate", response_model=List[EvaluatedRecord])
+async def evaluate_calculations(request: EvaluateRequest, session: SessionUser = Depends(current_user)):
+    columns = {}
+    for field in Fundamentals.model_fields:
+        if field != "company_name":
+            columns[field] = [getattr(record, field) for record in request.records]
+    scored = score({field: [math.nan if value is None else value for value in values]
+                    for field, values in columns.items()})
+
+    results = []
+    for i, record in enumerate(request.records):
+        result = {"company_name": record.company_name}
+        for field in METRIC_FIELDS + ["margin_of_safety", "rating", "quality"]:
+            result[field] = sanitize_float(float(scored[field][i]))
+        results.append(result)
+
+    if request.save:
+        saved = await insert_calculation_results(session.user_id, results)
+        if len(saved) != len(results):
+            raise HTTPException(status_code=400, detail="Error saving history")
+        for result, row in zip(results, saved):
+            result["history_id"] = row["history_id"]
+    return results
 
 # Create a new calculation history record
 @router.post("/calculation/create", response_model=CreateCalHistory)
-async def create_cal_history(data: CreateCalHistory):
+async def create_cal_history(data: CreateCalHistory, session: SessionUser = Depends(current_user)):
+    authorize(session, data.user_id)
     # Sanitize the float values in the data
     sanitized_data = {key: sanitize_float(value) for key, value in data.dict().items()}
 
@@ -73,19 +149,51 @@ async def create_cal_history(data: CreateCalHistory):
     
     return dict(record)
 
-# Get all calculation history records by user_id
+# Get calculation history records by user_id, newest first by default
+# e.g. /api/calculation/7?q=app&order_by=rating&order=desc&limit=50
+# A full page sends X-Next-Cursor; pass it back as ?cursor= for the next one
 @router.get("/calculation/{user_id}", response_model=List[CalHistory])
-async def get_calculator_history(user_id: int):
-    result = await get_calculation_history_by_user_id(user_id)
-    if not result:
+async def get_calculator_history(
+    user_id: int,
+    q: Optional[str] = None,
+    order_by: str = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_HISTORY_LIMIT),
+    cursor: Optional[str] = None,
+    session: SessionUser = Depends(current_user),
+):
+    authorize(session, user_id)
+    if order_by not in CALCULATION_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot order by {order_by}")
+
+    after = None
+    if cursor:
+        value, history_id = decode_cursor(cursor)
+        try:
+            if value is not None:
+                if order_by == "created_at":
+                    value = datetime.fromisoformat(value)
+                elif order_by != "company_name":
+                    value = Decimal(str(value))
+            after = (value, int(history_id))
+        except (TypeError, ValueError, ArithmeticError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    result = await get_calculation_history_page(user_id, q, order_by, order == "desc", limit, after)
+    if not result and not (q or after):
         raise HTTPException(status_code=404, detail="No history records found for this user.")
-    
-    return [dict(record) for record in result]
+
+    headers = {}
+    if limit is not None and len(result) == limit:
+        last = result[-1]
+        value = last[order_by]
+        headers["X-Next-Cursor"] = encode_cursor(value.isoformat() if isinstance(value, datetime) else value, last["history_id"])
+    return Response(content=rows_body(result), media_type="application/json", headers=headers)
 
 # Delete a specific calculation history by ID
 @router.delete("/calculation/{history_id}")
-async def delete_calculator_history(history_id: int):
-    record = await delete_calculation_history(history_id)
+async def delete_calculator_history(history_id: int, session: SessionUser = Depends(current_user)):
+    record = await delete_calculation_history(history_id, None if session.is_admin else session.user_id)
     
     if record is None:
         raise HTTPException(status_code=404, detail="History record not found")
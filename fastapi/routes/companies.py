@@ -0,0 +1,50 @@
+# routes/companies.py
+# Per-company time series from the snapshot history the loaders append to
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import BaseModel
+from typing import Optional, List, Literal
+from datetime import date
+from database import get_company_history
+from screener import SCREEN_METRICS, select_list
+from serialization import rows_body
+
+router = APIRouter()
+
+class Snapshot(BaseModel):
+    index_name: str
+    as_of: date
+    stock_price: Optional[float] = None
+    intrinsic_value: Optional[float] = None
+    margin_of_safety: Optional[float] = None
+    rating: Optional[float] = None
+    gross_profit_margin: Optional[float] = None
+    return_on_equity: Optional[float] = None
+    roic: Optional[float] = None
+    sga_to_revenue: Optional[float] = None
+    debt_to_equity: Optional[float] = None
+    current_ratio: Optional[float] = None
+    cash_ratio: Optional[float] = None
+    quick_ratio: Optional[float] = None
+    roa: Optional[float] = None
+
+# History of one company, e.g. /api/companies/AAPL/history?from=2024-01-01&interval=week&index=sp500
+# (ratings keep the scale of their index: 0-1 for SP500, 0-100 for Nasdaq100)
+@router.get("/companies/{ticker}/history", response_model=List[Snapshot])
+async def read_company_history(
+    ticker: str,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    index: Optional[str] = None,
+    # Downsampling: keep the last snapshot of each week, month, ...
+    interval: Literal["day", "week", "month", "quarter", "year"] = "day",
+):
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    snapshots = await get_company_history(
+        ticker.upper(), select_list(SCREEN_METRICS), start, end, index,
+        None if interval == "day" else interval,
+    )
+    if not snapshots:
+        raise HTTPException(status_code=404, detail=f"No history found for {ticker.upper()}")
+    return Response(content=rows_body(snapshots), media_type="application/json")
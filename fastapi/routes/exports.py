@@ -0,0 +1,52 @@
+# routes/exports.py
+# Streaming downloads of whole universes, their snapshot history and calculation history
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import date
+from auth import SessionUser, authorize, current_user
+from database import CALCULATION_EXPORT_FIELDS, stream_index, stream_index_history, stream_calculation_history
+from export import EXPORT_FORMATS, encode_stream
+from screener import INDEX_FIELDS, INDEX_TABLES, SCREEN_METRICS, select_list
+
+router = APIRouter()
+
+
+# `columns` are the names of the exported columns, for headers and schemas sent before any row
+def export_response(export_format: str, batches, columns: list, filename: str) -> StreamingResponse:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {export_format} (use one of {', '.join(EXPORT_FORMATS)})")
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        encode_stream(export_format, batches, columns),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
+
+
+# Whole index, e.g. /api/export/sp500?format=csv
+# With history=true every stored snapshot (optionally from / to an as_of date) instead of the latest
+@router.get("/export/{index}")
+async def export_index(
+    index: str,
+    format: str = "ndjson",
+    history: bool = False,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+):
+    table = INDEX_TABLES.get(index.lower())
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Unknown index: {index}")
+    if history:
+        columns = ["company"] + SCREEN_METRICS
+        batches = stream_index_history(table, select_list(columns), start, end)
+        return export_response(format, batches, ["as_of"] + columns, f"{table}_history")
+    return export_response(format, stream_index(f"{table}_latest", select_list(INDEX_FIELDS)), INDEX_FIELDS, table)
+
+
+# A user's calculation history, e.g. /api/export/calculations/7?format=csv
+@router.get("/export/calculations/{user_id}")
+async def export_calculation_history(user_id: int, format: str = "ndjson", session: SessionUser = Depends(current_user)):
+    authorize(session, user_id)
+    return export_response(format, stream_calculation_history(user_id), CALCULATION_EXPORT_FIELDS, f"calculations_{user_id}")
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
 from database import (
     insert_forum_post,
@@ -7,12 +8,35 @@ from database import (
     delete_forum_post,
     insert_forum_reply,
     get_replies_for_post,
+    get_replies_for_posts,
+    get_forum_feed,
     delete_forum_reply,
+    get_forum_version,
 )
+from http_cache import CachedResponse, conditional_response, revalidate, negotiate_coding, version_etag, COMPRESS_MIN_SIZE
+from response_cache import request_key
+from serialization import json_body
+from auth import SessionUser, authorize, current_user
+from screener import encode_cursor, decode_cursor
 from typing import Optional, List
 from datetime import datetime
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_FEED_LIMIT = 100
+MAX_REPLY_BATCH = 100
+
+# Validators of a forum listing, taken from the forum version row rather than the body,
+# so a client holding the current listing gets its 304 before any post is read.
+# Returns (etag, last_modified, 304 response or None); no validators if the version is unknown.
+async def forum_validators(request: Request):
+    version = await get_forum_version()
+    if version is None:
+        return None, None, None
+    etag = version_etag("forum", version["version"], request_key(request))
+    last_modified = version["updated_at"]
+    return etag, last_modified, revalidate(request, etag, last_modified, negotiate_coding(request, COMPRESS_MIN_SIZE))
 
 # Models for posts and replies
 class ForumPostCreate(BaseModel):
@@ -32,6 +56,9 @@ class ForumPost(BaseModel):
     created_at: Optional[datetime]
     username: str
 
+class ForumFeedPost(ForumPost):
+    reply_count: int
+
 class ForumReplyCreate(BaseModel):
     user_id: int
     forum_id: int
@@ -47,7 +74,8 @@ class ForumReply(BaseModel):
 
 # Create a forum reply
 @router.post("/forum/reply")
-async def create_forum_reply(reply: ForumReplyCreate):
+async def create_forum_reply(reply: ForumReplyCreate, session: SessionUser = Depends(current_user)):
+    authorize(session, reply.user_id)
     result = await insert_forum_reply(reply.user_id, reply.forum_id, reply.content)
     if not result:
         raise HTTPException(status_code=500, detail="Failed to create forum reply")
@@ -61,17 +89,24 @@ async def get_replies(forum_id: int):
         raise HTTPException(status_code=404, detail="No replies found for this post")
     return replies
 
+# Fetch the replies of several posts in one query, e.g. /api/forum/replies?ids=3&ids=7
+@router.get("/forum/replies", response_model=List[ForumReply])
+async def get_replies_batch(ids: List[int] = Query(..., max_length=MAX_REPLY_BATCH)):
+    replies = await get_replies_for_posts(list(dict.fromkeys(ids)))
+    return [dict(reply) for reply in replies]
+
 # Delete a forum reply
 @router.delete("/forum/reply/delete/{reply_id}")
-async def delete_reply(reply_id: int):
-    result = await delete_forum_reply(reply_id)
+async def delete_reply(reply_id: int, session: SessionUser = Depends(current_user)):
+    result = await delete_forum_reply(reply_id, None if session.is_admin else session.user_id)
     if not result:
         raise HTTPException(status_code=404, detail="Reply not found")
     return {"message": "Reply deleted successfully"}
 
 # Create a new forum post
 @router.post("/forum/create")
-async def create_forum_post(post: ForumPostCreate):
+async def create_forum_post(post: ForumPostCreate, session: SessionUser = Depends(current_user)):
+    authorize(session, post.user_id)
     result = await insert_forum_post(post.user_id, post.title, post.content)
     if not result:
         raise HTTPException(status_code=500, detail="Failed to create forum post")
@@ -79,28 +114,57 @@ async def create_forum_post(post: ForumPostCreate):
 
 # Fetching latest forum posts
 @router.get("/forum", response_model=List[ForumPost])
-async def get_latest_posts():
+async def get_latest_posts(request: Request):
+    etag, last_modified, not_modified = await forum_validators(request)
+    if not_modified is not None:
+        return not_modified
     result = await get_latest_forum_posts()
     if not result:
         raise HTTPException(status_code=404, detail="No forum posts found")
-    return result
+    posts = [ForumPost.model_validate(dict(row)).model_dump() for row in result]
+    return conditional_response(request, CachedResponse(json_body(posts), etag=etag, last_modified=last_modified))
+
+# Newest-first page of posts with reply counts, e.g. /api/forum/feed?limit=20
+# A full page sends X-Next-Cursor; pass it back as ?cursor= for the next one
+@router.get("/forum/feed", response_model=List[ForumFeedPost])
+async def get_feed(request: Request, limit: int = Query(20, ge=1, le=MAX_FEED_LIMIT), cursor: Optional[str] = None):
+    after = None
+    if cursor:
+        created_at, forum_id = decode_cursor(cursor)
+        try:
+            after = (datetime.fromisoformat(created_at), int(forum_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    etag, last_modified, not_modified = await forum_validators(request)
+    if not_modified is not None:
+        return not_modified
+    result = await get_forum_feed(limit, after)
+    posts = [ForumFeedPost.model_validate(dict(row)).model_dump() for row in result]
+
+    headers = {}
+    if len(result) == limit:
+        last = result[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last["created_at"].isoformat(), last["forum_id"])
+    return conditional_response(request, CachedResponse(json_body(posts), headers, etag, last_modified))
 
 # Edit a forum post
 @router.put("/forum/edit/{forum_id}")
-async def edit_forum_post(forum_id: int, post: ForumPostUpdate):
-    result = await update_forum_post(forum_id, post.title, post.content)
+async def edit_forum_post(forum_id: int, post: ForumPostUpdate, session: SessionUser = Depends(current_user)):
+    result = await update_forum_post(forum_id, post.title, post.content, None if session.is_admin else session.user_id)
     if not result:
         raise HTTPException(status_code=404, detail="Forum post not found or failed to update")
     return {"message": "Post updated successfully", "post": result}
 
 # Delete a forum post
 @router.delete("/forum/delete/{forum_id}")
-async def delete_forum_post(forum_id: int):
+async def remove_forum_post(forum_id: int, session: SessionUser = Depends(current_user)):
     try:
-        result = await delete_forum_post(forum_id)
+        result = await delete_forum_post(forum_id, None if session.is_admin else session.user_id)
         if not result:
             raise HTTPException(status_code=404, detail="Forum post not found")
         return {"message": "Post deleted successfully"}
-    except Exception as e:
-        print(f"Error deleting forum post {forum_id}: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error deleting forum post %s", forum_id)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,67 @@
+# routes/rankings.py
+# Per-metric leaderboards and percentiles, precomputed by the loaders at load time
+
+import logging
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+from database import get_rankings, get_index_version
+from response_cache import index_cache, request_key
+from http_cache import CachedResponse, conditional_response, revalidate, negotiate_coding, version_etag, COMPRESS_MIN_SIZE
+from screener import INDEX_TABLES, MAX_LIMIT, SCREEN_METRICS
+from serialization import rows_body
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+class RankedCompany(BaseModel):
+    company: str
+    as_of: date
+    value: Optional[float] = None
+    rank: int  # 1 is the best value; ties share a rank
+    percentile: float  # Share of ranked companies below this one, 0-100
+    ranked: int  # Companies with a value for this metric
+
+# Leaderboard of one metric, e.g. /api/rankings/sp500?metric=margin_of_safety&top=10
+# (lower is better for sga_to_revenue and debt_to_equity, higher for the rest)
+@router.get("/rankings/{index}", response_model=List[RankedCompany])
+async def read_rankings(
+    request: Request,
+    index: str,
+    metric: str = "rating",
+    top: int = Query(20, ge=1, le=MAX_LIMIT),
+):
+    table = INDEX_TABLES.get(index.lower())
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Unknown index: {index}")
+    if metric not in SCREEN_METRICS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric: {metric}")
+
+    # Rankings change only with a load, so they share the table's cache and validators
+    key = request_key(request)
+    cached = index_cache.get(table, key)
+    if cached is not None:
+        return conditional_response(request, cached)
+    generation = index_cache.generation(table)
+
+    etag = last_modified = None
+    version = await get_index_version(table)
+    if version is not None:
+        etag = version_etag(table, version["version"], key)
+        last_modified = version["updated_at"]
+        not_modified = revalidate(request, etag, last_modified, negotiate_coding(request, COMPRESS_MIN_SIZE))
+        if not_modified is not None:
+            return not_modified
+
+    try:
+        rankings = await get_rankings(f"{table}_rankings", metric, top)
+    except Exception as e:
+        logger.warning("Could not read the rankings of %s: %s", table, e)
+        raise HTTPException(status_code=503, detail=f"Rankings of {table} are not available yet")
+    if not rankings:
+        raise HTTPException(status_code=404, detail=f"No {metric} rankings found for {table}")
+
+    entry = CachedResponse(rows_body(rankings), etag=etag, last_modified=last_modified)
+    index_cache.put(table, key, entry, generation)
+    return conditional_response(request, entry)
@@ -0,0 +1,64 @@
+# routes/search.py
+# Type-ahead search over tickers, company names and forum posts
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import Optional, List, Literal
+from datetime import datetime
+from database import get_search_companies, search_forum_posts
+from response_cache import index_cache
+from screener import INDEX_TABLES
+from search import SEARCH_REBUILD_SECONDS, company_index
+
+router = APIRouter()
+
+MAX_SEARCH_LIMIT = 50
+
+# Shorter queries only search companies: trigram indexes can't narrow down one or two letters
+MIN_POST_QUERY = 3
+
+class CompanyMatch(BaseModel):
+    company: str
+    name: Optional[str] = None
+    indexes: List[str]  # Index tables the company is in, e.g. ["SP500", "Nasdaq100"]
+    score: float  # 4 exact ticker, 3 ticker prefix, 2 name prefix, 1.5 word prefix, < 1 typo similarity
+
+class PostMatch(BaseModel):
+    forum_id: int
+    user_id: int
+    title: str
+    snippet: str  # First 200 characters of the content
+    created_at: datetime
+    score: float  # Word similarity of the query to the title, 0-1
+
+class SearchResults(BaseModel):
+    query: str
+    companies: List[CompanyMatch]
+    posts: List[PostMatch]
+
+async def load_companies():
+    return await get_search_companies(list(INDEX_TABLES.values()))
+
+# e.g. /api/search?q=appl, /api/search?q=nvdia&scope=companies&index=nasdaq100
+@router.get("/search", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    scope: Literal["all", "companies", "posts"] = "all",
+    index: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    table = None
+    if index is not None:
+        table = INDEX_TABLES.get(index.lower())
+        if table is None:
+            raise HTTPException(status_code=404, detail=f"Unknown index: {index}")
+
+    query = q.strip()
+    companies, posts = [], []
+    if scope in ("all", "companies"):
+        # Loads rebuild the index through the LISTEN connection; without it, rebuild on age
+        await company_index.refresh(load_companies, None if index_cache.enabled else SEARCH_REBUILD_SECONDS)
+        companies = company_index.search(query, limit, table)
+    if scope in ("all", "posts") and len(query) >= MIN_POST_QUERY:
+        posts = [dict(row) for row in await search_forum_posts(query, limit)]
+    return {"query": query, "companies": companies, "posts": posts}
@@ -1,30 +1,32 @@
-from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Response
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 from database import *
+from passwords import password_pool
+from auth import SESSION_COOKIE, TOKEN_TTL, SessionUser, authorize, current_user, issue_token, require_admin
 
 router = APIRouter()
 
-# Pydantic model for user response
+# Pydantic model for user response (the password hash never leaves the server)
 class User(BaseModel):
     user_id: int
     username: str
-    password_hash: str
     email: str
     created_at: datetime
     status: int 
-# Endpoint to get all users
+# Endpoint to get all users (admins only)
 @router.get("/users", response_model=List[User])
-async def read_users():
-    query = "SELECT * FROM users" 
+async def read_users(admin: SessionUser = Depends(require_admin)):
+    query = "SELECT user_id, username, email, created_at, status FROM users" 
     users = await database.fetch_all(query) 
     return users
 
 # Pydantic model for user update
+# (a missing password_hash keeps the current password)
 class UserUpdate(BaseModel):
    username: Optional[str]
-   password_hash: Optional[str]
+   password_hash: Optional[str] = None
    email: Optional[str] 
 
 # Pydantic model for login
@@ -47,7 +49,7 @@ async def create_user(user: UserCreate):
         raise HTTPException(status_code=400, detail="Username already exists")
 
     # Hash the password before saving
-    hashed_password = bcrypt.hashpw(user.password_hash.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    hashed_password = await password_pool.run(hash_password, user.password_hash)
 
     result = await insert_user(user.username, hashed_password, user.email)
     if result is None:
@@ -56,19 +58,29 @@ async def create_user(user: UserCreate):
 
 
 
+# Queue depth and timings of the bcrypt pool
+@router.get("/users/password-pool")
+async def read_password_pool_stats():
+    return password_pool.stats()
+
 # Endpoint to get a user by user_id
 @router.get("/users/{user_id}", response_model=User)
-async def get_user_by_id(user_id: int):
+async def read_user(user_id: int, session: SessionUser = Depends(current_user)):
+   authorize(session, user_id)
    result = await get_user_by_id(user_id)
    if result is None:
        raise HTTPException(status_code=404, detail="User not found")
-   return result
+   return dict(result)
 
 
 # Endpoint to update a user
 @router.put("/users/{user_id}", response_model=User)
-async def update_user_endpoint(user_id: int, user: UserUpdate):
-   result = await update_user(user_id, user.username, user.password_hash, user.email)
+async def update_user_endpoint(user_id: int, user: UserUpdate, session: SessionUser = Depends(current_user)):
+   authorize(session, user_id)
+   password_hash = None
+   if user.password_hash:
+       password_hash = await password_pool.run(hash_password, user.password_hash)
+   result = await update_user(user_id, user.username, password_hash, user.email)
    if result is None:
        raise HTTPException(status_code=404, detail="User not found")
    return result
@@ -76,7 +88,8 @@ async def update_user_endpoint(user_id: int, user: UserUpdate):
 
 # Endpoint to delete a user
 @router.delete("/users/{user_id}")
-async def delete_user_endpoint(user_id: int):
+async def delete_user_endpoint(user_id: int, session: SessionUser = Depends(current_user)):
+    authorize(session, user_id)
     result = await delete_user(user_id)
     if result is None:
         raise HTTPException(status_code=404, detail="User not found")
@@ -84,21 +97,35 @@ async def delete_user_endpoint(user_id: int):
 
 
 # Endpoint for user login
+# Issues a signed session token, returned in the body and set as an HttpOnly cookie
 @router.post("/users/login")
-async def login_user(user: UserLogin):
+async def login_user(user: UserLogin, response: Response):
     db_user = await get_user_by_email(user.email)
 
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not bcrypt.checkpw(user.password_hash.encode('utf-8'), db_user.password_hash.encode('utf-8')):
+    if not await password_pool.run(verify_password, user.password_hash, db_user["password_hash"]):
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
+    is_admin = db_user["status"] == 1  # Assuming status 1 means admin
+    token, expires_at = issue_token(db_user["user_id"], is_admin)
+    response.set_cookie(SESSION_COOKIE, token, max_age=TOKEN_TTL, httponly=True, samesite="lax")
+
     # Return user info along with isAdmin status
     return {
-        "user_id": db_user.user_id,
-        "username": db_user.username,
-        "email": db_user.email,
-        "created_at": db_user.created_at,
-        "isAdmin": db_user.status == 1  # Assuming status 1 means admin
-    }
\ No newline at end of file
+        "user_id": db_user["user_id"],
+        "username": db_user["username"],
+        "email": db_user["email"],
+        "created_at": db_user["created_at"],
+        "isAdmin": is_admin,
+        "token": token,
+        "token_type": "bearer",
+        "expires_at": expires_at,
+    }
+
+# Endpoint for user logout (tokens are stateless, so this only drops the cookie)
+@router.post("/users/logout")
+async def logout_user(response: Response):
+    response.delete_cookie(SESSION_COOKIE, httponly=True, samesite="lax")
+    return {"detail": "Logged out"}
\ No newline at end of file
@@ -0,0 +1,176 @@
+# screener.py
+# Query-string parsing and the shared handler of the filtered / sorted / paginated index endpoints
+
+import base64
+import binascii
+import json
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from database import get_index_version, screen_index
+from http_cache import COMPRESS_MIN_SIZE, CachedResponse, conditional_response, negotiate_coding, revalidate, version_etag
+from response_cache import index_cache, request_key
+from serialization import rows_body, sql_float
+
+# Columns of the SP500 / Nasdaq100 latest views
+INDEX_FIELDS = [
+    "company", "stock_price", "intrinsic_value", "margin_of_safety", "rating",
+    "gross_profit_margin", "return_on_equity", "roic", "sga_to_revenue",
+    "debt_to_equity", "current_ratio", "cash_ratio", "quick_ratio", "roa", "as_of",
+]
+
+# Numeric columns that can be filtered and sorted on (indexed by the loader)
+SCREEN_METRICS = [
+    "stock_price", "intrinsic_value", "margin_of_safety", "rating",
+    "gross_profit_margin", "return_on_equity", "roic", "sga_to_revenue",
+    "debt_to_equity", "current_ratio", "cash_ratio", "quick_ratio", "roa",
+]
+
+# Filter suffixes, e.g. roic_gt=30&debt_to_equity_lt=0.8
+FILTER_OPERATORS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# Query parameters that are not metric filters
+RESERVED_PARAMS = {"order_by", "order", "limit", "offset", "cursor", "fields", "company"}
+
+MAX_LIMIT = 1000
+
+# Index names accepted in paths, and the table behind each
+INDEX_TABLES = {"sp500": "SP500", "nasdaq100": "Nasdaq100"}
+
+
+def parse_filters(query_params) -> list:
+    """Turn `<metric>_<op>=<value>` parameters into (column, operator, value) triples."""
+    filters = []
+    for key, raw in query_params.multi_items():
+        if key in RESERVED_PARAMS:
+            continue
+        column, _, suffix = key.rpartition("_")
+        if column not in SCREEN_METRICS or suffix not in FILTER_OPERATORS:
+            raise HTTPException(status_code=400, detail=f"Unknown filter: {key}")
+        try:
+            value = Decimal(raw)
+        except InvalidOperation:
+            raise HTTPException(status_code=400, detail=f"Filter {key} needs a number")
+        if not value.is_finite():
+            raise HTTPException(status_code=400, detail=f"Filter {key} needs a finite number")
+        filters.append((column, FILTER_OPERATORS[suffix], value))
+    return filters
+
+
+def parse_companies(query_params) -> List[str]:
+    """Tickers of repeated `company=` parameters, e.g. company=AAPL&company=MSFT."""
+    companies = [company.strip().upper() for company in query_params.getlist("company") if company.strip()]
+    if len(companies) > MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_LIMIT} companies per request")
+    return companies
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma separated field selection; company is always included."""
+    if not fields:
+        return list(INDEX_FIELDS)
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in INDEX_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["company"] + [field for field in INDEX_FIELDS if field in selected and field != "company"]
+
+
+def select_list(fields: List[str]) -> List[str]:
+    """Select expressions for `fields`, with the metrics cast to JSON-ready float8."""
+    return [sql_float(field) if field in SCREEN_METRICS else field for field in fields]
+
+
+def parse_order_by(order_by: Optional[str]) -> str:
+    if order_by is None:
+        return "company"
+    if order_by != "company" and order_by not in SCREEN_METRICS:
+        raise HTTPException(status_code=400, detail=f"Cannot order by {order_by}")
+    return order_by
+
+
+def encode_cursor(value, company: str) -> str:
+    """Opaque keyset cursor pointing just after (value, company)."""
+    payload = json.dumps([None if value is None else str(value), company])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """(value, company) of a cursor from encode_cursor; 400 for anything a client could have tampered with."""
+    try:
+        value, company = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # encode_cursor only writes a string (or null) value and a string or integer key
+    if not (value is None or isinstance(value, str)) or isinstance(company, bool) or not isinstance(company, (str, int)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, company
+
+
+def decode_index_cursor(cursor: str, order_by: str):
+    """Keyset position of an index screen: (Decimal or None, company) after the last row seen."""
+    value, company = decode_cursor(cursor)
+    if not isinstance(company, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if value is None or order_by == "company":
+        return value, company
+    try:
+        value = Decimal(value)
+    except InvalidOperation:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not value.is_finite():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, company
+
+
+async def screen_response(request, table: str, universe: str, order_by: Optional[str], descending: bool,
+                          limit: Optional[int], offset: int, cursor: Optional[str], fields: Optional[str]):
+    """
+    Response of an index endpoint over the latest view of `table`.
+
+    Parameters are checked before anything else. Valid requests are served
+    from the response cache until the next load; otherwise validated against
+    the table's data version, so a client holding the current version gets its
+    304 without running the screen query. `universe` names the index in errors.
+    """
+    # Validate first: a bad request is a 400 even for a client holding current validators
+    filters = parse_filters(request.query_params)
+    companies = parse_companies(request.query_params)
+    order_by = parse_order_by(order_by)
+    selected = parse_fields(fields)
+    if order_by not in selected:
+        selected.append(order_by)  # Needed to build the next cursor
+    after = decode_index_cursor(cursor, order_by) if cursor else None
+
+    key = request_key(request)
+    cached = index_cache.get(table, key)
+    if cached is not None:
+        return conditional_response(request, cached)
+    generation = index_cache.generation(table)
+
+    etag = last_modified = None
+    version = await get_index_version(table)
+    if version is not None:
+        etag = version_etag(table, version["version"], key)
+        last_modified = version["updated_at"]
+        not_modified = revalidate(request, etag, last_modified, negotiate_coding(request, COMPRESS_MIN_SIZE))
+        if not_modified is not None:
+            return not_modified
+
+    rows = await screen_index(f"{table}_latest", select_list(selected), filters, order_by, descending, limit, offset, after, companies)
+    if not rows and not (filters or companies or after or offset):
+        raise HTTPException(status_code=404, detail=f"No {universe} data found")
+
+    # A full page means there may be more: hand out a keyset cursor for the next one
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        last = rows[-1]
+        # float8 of a NUMERIC the loader wrote from a float round-trips exactly, so the cursor stays exact
+        headers["X-Next-Cursor"] = encode_cursor(last[order_by], last["company"])
+
+    # Rows come back JSON-ready (float8, NaN as NULL), so they go straight to bytes
+    entry = CachedResponse(rows_body(rows), headers, etag, last_modified)
+    index_cache.put(table, key, entry, generation)
+    return conditional_response(request, entry)
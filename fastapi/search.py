@@ -0,0 +1,158 @@
+# search.py
+# In-memory prefix and trigram index over tickers and company names, rebuilt after every load
+
+import asyncio
+import os
+import re
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+# While loads can't be heard (no LISTEN connection), rebuild at most this stale (seconds)
+SEARCH_REBUILD_SECONDS = float(os.environ.get("SEARCH_REBUILD_SECONDS", 300))
+
+# Least trigram similarity a typo match needs; pg_trgm's default threshold
+MIN_SIMILARITY = 0.3
+
+# Scores of the match kinds, best first; typo matches score their similarity (below 1)
+EXACT_TICKER = 4.0
+PREFIX_KINDS = {"ticker": 3.0, "name": 2.0, "word": 1.5}
+
+
+def normalize(text: str) -> str:
+    """Lower case letters and digits, every other run of characters a single space."""
+    return re.sub(r"[^0-9a-z]+", " ", text.lower()).strip()
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of every word, padded like pg_trgm: two spaces before a word, one after."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def prefix_range(terms: list, prefix: str):
+    """(term, company id) pairs of sorted `terms` starting with `prefix`, in order."""
+    for position in range(bisect_left(terms, (prefix,)), len(terms)):
+        if not terms[position][0].startswith(prefix):
+            return
+        yield terms[position]
+
+
+class CompanyIndex:
+    """
+    Search index over the companies of every index table.
+
+    Prefixes are answered by bisecting sorted lists of terms (tickers, full
+    names, single words of names), typos by an inverted index from trigram to
+    term. Match kinds are tried best first and a search stops once it has
+    `limit` companies, so a query never walks the whole universe.
+    """
+
+    def __init__(self):
+        self.companies = []
+        self.prefixes = {kind: [] for kind in PREFIX_KINDS}  # kind -> sorted (term, company id)
+        self.terms = []  # (term, company id) of every kind, for the trigram index
+        self.grams = defaultdict(list)  # trigram -> ids into self.terms
+        self.term_grams = []  # Trigram count of every term, for the similarity
+        # Bumped by invalidate(); the index is current while built_generation matches
+        self.generation = 0
+        self.built_generation = -1
+        self.built_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def build(self, companies: list):
+        """Replace the index with `companies` (dicts with company, name, indexes)."""
+        prefixes = {kind: [] for kind in PREFIX_KINDS}
+        for company_id, company in enumerate(companies):
+            prefixes["ticker"].append((normalize(company["company"]), company_id))
+            name = normalize(company["name"] or "")
+            if name:
+                prefixes["name"].append((name, company_id))
+                prefixes["word"].extend((word, company_id) for word in set(name.split()) if word != name)
+        for terms in prefixes.values():
+            terms.sort()
+
+        terms = [term for kind in PREFIX_KINDS for term in prefixes[kind]]
+        grams = defaultdict(list)
+        term_grams = []
+        for term_id, (term, _) in enumerate(terms):
+            term_trigrams = trigrams(term)
+            term_grams.append(len(term_trigrams))
+            for gram in term_trigrams:
+                grams[gram].append(term_id)
+
+        # Swap everything at once, so a search never sees half an index
+        self.companies, self.prefixes, self.terms, self.grams, self.term_grams = companies, prefixes, terms, grams, term_grams
+        self.built_at = time.monotonic()
+
+    def invalidate(self, table: str = None):
+        self.generation += 1
+
+    def stale(self, max_age: float = None) -> bool:
+        if self.built_generation != self.generation:
+            return True
+        return max_age is not None and time.monotonic() - self.built_at > max_age
+
+    async def refresh(self, load, max_age: float = None):
+        """Rebuild from `load()` (an async function returning the companies) when stale."""
+        if not self.stale(max_age):
+            return
+        async with self.lock:
+            if not self.stale(max_age):
+                return  # Another request rebuilt it while we waited
+            generation = self.generation
+            self.build(await load())
+            self.built_generation = generation
+
+    def _typo_matches(self, query: str) -> list:
+        """(similarity, company id) of every term close enough to `query`, best first."""
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.grams.get(gram, ()))
+        matches = []
+        for term_id, count in shared.items():
+            # Jaccard similarity of the trigram sets, as pg_trgm's similarity()
+            similarity = count / (len(query_grams) + self.term_grams[term_id] - count)
+            if similarity >= MIN_SIMILARITY:
+                matches.append((similarity, self.terms[term_id][1]))
+        matches.sort(key=lambda match: -match[0])
+        return matches
+
+    def search(self, query: str, limit: int, table: str = None) -> list:
+        """Best `limit` companies for `query`, optionally only those in `table`."""
+        query = normalize(query)
+        if not query:
+            return []
+        found = {}  # company id -> score, filled best first
+
+        def take(company_id, score) -> bool:
+            """Keep a company unless already found; True once there are enough."""
+            if company_id not in found and (table is None or table in self.companies[company_id]["indexes"]):
+                found[company_id] = score
+            return len(found) >= limit
+
+        def take_prefixes() -> bool:
+            for term, company_id in prefix_range(self.prefixes["ticker"], query):
+                if term != query:
+                    break
+                if take(company_id, EXACT_TICKER):
+                    return True
+            for kind, score in PREFIX_KINDS.items():
+                for term, company_id in prefix_range(self.prefixes[kind], query):
+                    if take(company_id, score):
+                        return True
+            return False
+
+        # Typo matches score below every prefix match, so they only fill what the prefixes left
+        if not take_prefixes():
+            for similarity, company_id in self._typo_matches(query):
+                if take(company_id, similarity):
+                    break
+        return [{**self.companies[company_id], "score": round(score, 3)} for company_id, score in found.items()]
+
+
+company_index = CompanyIndex()
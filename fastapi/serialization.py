@@ -0,0 +1,54 @@
+# serialization.py
+# Shared fast path from database rows to JSON bytes
+
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import orjson  # Optional: several times faster than the json module
+except ImportError:
+    orjson = None
+
+
+def sql_float(column: str) -> str:
+    """
+    Select expression returning a NUMERIC column as float8, with NaN / +-inf as NULL.
+
+    Rows then arrive ready for JSON and need no per-value cleanup in Python.
+    """
+    return (
+        f"CASE WHEN {column}::float8 IN ('NaN', 'Infinity', '-Infinity') THEN NULL"
+        f" ELSE {column}::float8 END AS {column}"
+    )
+
+
+def sanitize_float(value):
+    """Sanitize float values to ensure they are JSON compliant."""
+    if isinstance(value, Decimal):
+        value = float(value)  # Convert Decimal to float
+    if isinstance(value, float):
+        if math.isinf(value) or math.isnan(value):
+            return None  # Replace invalid float values with None
+    return value
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return sanitize_float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_body(content) -> bytes:
+    """Serialize plain lists / dicts (dates, datetimes and Decimals allowed) to compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def rows_body(rows) -> bytes:
+    """JSON array of database rows, one object per row with the selected columns."""
+    return json_body([dict(row) for row in rows])
@@ -0,0 +1,3 @@
+# ingestion/__init__.py
+# Index loader: fetch, score and store the universes in universes/
+# Run with: python -m ingestion universes/sp500.json universes/nasdaq100.json
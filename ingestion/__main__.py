@@ -0,0 +1,124 @@
+# ingestion/__main__.py
+# Command line entry point: python -m ingestion universes/sp500.json universes/nasdaq100.json
+
+import argparse
+import cProfile
+import os
+from contextlib import nullcontext
+
+from ingestion.cache import CACHE_PATH, RawCache
+from ingestion.db import INGEST_DSN, connect
+from ingestion.engine import run_ingestion
+from ingestion.fetch import MAX_WORKERS
+from ingestion.prices import refresh_prices
+from ingestion.sources import FIXTURES_PATH, SOURCES, open_source
+from ingestion.telemetry import RunStats, record_run
+from ingestion.universe import load_universe
+from ingestion.writer import FLUSH_SIZE
+
+try:
+    import pyinstrument  # Optional: sampling profiler with an HTML report, used for --profile *.html
+except ImportError:
+    pyinstrument = None
+
+
+class Profiler:
+    """cProfile (or pyinstrument for an .html path) around the run, dumped to `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sampling = path.endswith(".html") and pyinstrument is not None
+        self.profiler = pyinstrument.Profiler() if self.sampling else cProfile.Profile()
+
+    def __enter__(self):
+        if self.sampling:
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.sampling:
+            self.profiler.stop()
+            with open(self.path, "w") as f:
+                f.write(self.profiler.output_html())
+        else:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.path)
+        print(f"Profile written to {self.path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ingestion", description="Load index tables from Yahoo Finance")
+    parser.add_argument("universes", nargs="+", metavar="UNIVERSE",
+                        help="universe config file, e.g. universes/sp500.json")
+    parser.add_argument("--prices-only", action="store_true",
+                        help="only refresh prices, saving today's snapshot with the stored fundamentals")
+    parser.add_argument("--offline", action="store_true",
+                        help="score from the raw-data cache without fetching anything")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="number of fetch threads")
+    parser.add_argument("--flush-size", type=int, default=FLUSH_SIZE, help="rows per multi-row INSERT")
+    parser.add_argument("--dsn", default=INGEST_DSN, help="PostgreSQL connection string")
+    parser.add_argument("--source", choices=SOURCES, default=os.environ.get("INGEST_SOURCE", "yfinance"),
+                        help="where payloads come from: live Yahoo Finance, live while saving fixtures, "
+                             "or replayed fixtures")
+    parser.add_argument("--fixtures", default=FIXTURES_PATH, metavar="PATH",
+                        help="fixture directory written by --source record and read by --source replay")
+    parser.add_argument("--latency", type=float, default=0.0, metavar="SECONDS",
+                        help="simulated latency of every replayed request")
+    parser.add_argument("--jitter", type=float, default=0.0, metavar="SECONDS",
+                        help="up to this much extra latency per replayed request, the same on every run")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="raw-data cache file; defaults to INGEST_CACHE_PATH for yfinance and to an empty "
+                             "in-memory cache (:memory:) for record and replay")
+    parser.add_argument("--report", default=os.environ.get("INGEST_REPORT_PATH") or None, metavar="PATH",
+                        help="write the run report (stage timings per ticker, retries, failures) as JSON")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="profile the run: cProfile stats, or a pyinstrument HTML report for *.html")
+    args = parser.parse_args(argv)
+
+    universes = [load_universe(path) for path in args.universes]
+    stats = RunStats("prices" if args.prices_only else "full", args.source)
+    source = None if args.offline else open_source(args.source, args.fixtures, args.latency, args.jitter)
+
+    # Record and replay start cold, so every run fetches (and records) every payload
+    cache_path = args.cache
+    if cache_path is None:
+        cache_path = CACHE_PATH if args.source == "yfinance" or args.offline else ":memory:"
+    cache = RawCache(cache_path) if cache_path else None
+
+    # Database connection setup
+    conn = connect(args.dsn)
+    counts, error = {}, None
+    try:
+        with Profiler(args.profile) if args.profile else nullcontext():
+            if args.prices_only:
+                # Rescore the stored rows against current prices from one multi-ticker download
+                counts = refresh_prices(conn, universes, stats=stats, source=source)
+            else:
+                counts = run_ingestion(conn, universes, max_workers=args.workers, flush_size=args.flush_size,
+                                       cache=cache, offline=args.offline, stats=stats, source=source)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        # Failed runs are summarized too, so regressions and outages show up in the history
+        stats.finish(counts, error)
+        try:
+            run_id = record_run(conn, stats)
+            print(f"Run {run_id} recorded in ingest_run")
+        except Exception as e:
+            print(f"Could not record the run summary: {e}")
+        conn.close()
+        if args.report:
+            stats.write_report(args.report)
+            print(f"Run report written to {args.report}")
+        print(stats.format())
+
+    for table, count in counts.items():
+        print(f"{table}: {count} rows saved")
+    print("Data has been successfully saved to the database.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# ingestion/cache.py
+# On-disk cache of raw yfinance payloads with per-kind TTLs
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from io import StringIO
+
+import pandas as pd
+
+# Cache location; set INGEST_CACHE_PATH to an empty string to disable caching
+CACHE_PATH = os.environ.get("INGEST_CACHE_PATH", os.path.join(".cache", "yfinance.sqlite"))
+
+# How long each kind of payload stays fresh, in seconds. Annual statements change
+# about once a year, the info blob (EPS, tax rate) slowly, prices constantly.
+CACHE_TTLS = {
+    "financials": float(os.environ.get("INGEST_TTL_FINANCIALS", 30 * 86400)),
+    "balance_sheet": float(os.environ.get("INGEST_TTL_BALANCE_SHEET", 30 * 86400)),
+    "info": float(os.environ.get("INGEST_TTL_INFO", 7 * 86400)),
+    "price": float(os.environ.get("INGEST_TTL_PRICE", 3600)),
+}
+
+# Payload kinds stored as DataFrames; everything else is plain JSON
+FRAME_KINDS = {"financials", "balance_sheet"}
+
+
+def dump_payload(kind: str, payload) -> str:
+    if kind in FRAME_KINDS:
+        return payload.to_json(orient="split", date_format="iso")
+    return json.dumps(payload, default=str)
+
+
+def load_payload(kind: str, text: str):
+    if kind in FRAME_KINDS:
+        return pd.read_json(StringIO(text), orient="split")
+    return json.loads(text)
+
+
+class RawCache:
+    """SQLite store of raw payloads keyed by (ticker, kind), safe to share between threads."""
+
+    def __init__(self, path: str = CACHE_PATH, ttls=CACHE_TTLS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttls = dict(ttls)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS raw_payload (
+                ticker TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (ticker, kind)
+            )
+            """)
+
+    def get(self, ticker: str, kind: str, allow_stale: bool = False):
+        """Return the cached payload, or None when it is missing or older than its TTL."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fetched_at, payload FROM raw_payload WHERE ticker = ? AND kind = ?",
+                (ticker, kind),
+            ).fetchone()
+        if row is None:
+            return None
+        fetched_at, text = row
+        if not allow_stale and time.time() - fetched_at > self.ttls.get(kind, 0):
+            return None
+        return load_payload(kind, text)
+
+    def put(self, ticker: str, kind: str, payload):
+        text = dump_payload(kind, payload)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO raw_payload (ticker, kind, fetched_at, payload) VALUES (?, ?, ?, ?)",
+                (ticker, kind, time.time(), text),
+            )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def open_default_cache():
+    """Open the cache at CACHE_PATH, or return None when caching is disabled."""
+    return RawCache(CACHE_PATH) if CACHE_PATH else None
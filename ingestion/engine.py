@@ -0,0 +1,122 @@
+# ingestion/engine.py
+# Fetch -> score -> write loop shared by every index universe
+
+from datetime import date
+
+import pandas as pd
+from tqdm import tqdm  # for the progress bar
+
+from ingestion.cache import open_default_cache
+from ingestion.fetch import MAX_WORKERS, fetch_all
+from ingestion.schema import (
+    COMPANY_TABLE, SNAPSHOT_TABLE, ensure_index_table, ensure_snapshot_partition, prune_index_table, publish_load,
+    refresh_rankings,
+)
+from ingestion.scoring import extract_fundamentals, score
+from ingestion.telemetry import RunStats
+from ingestion.universe import distinct_tickers
+from ingestion.writer import COMPANY_COLUMNS, COMPANY_KEY, FLUSH_SIZE, SNAPSHOT_COLUMNS, SNAPSHOT_KEY, BatchWriter
+
+
+def run_ingestion(conn, universes, max_workers: int = MAX_WORKERS, flush_size: int = FLUSH_SIZE,
+                  cache=None, offline: bool = False, stats: RunStats = None, source=None) -> dict:
+    """
+    Fetch, score and upsert every ticker of `universes` in a single transaction.
+
+    A ticker that belongs to several universes is fetched and scored once and
+    then written to each of their tables. Raw payloads go through the on-disk
+    cache (the default one when `cache` is None), so only stale entries are
+    fetched; offline=True scores from the cache alone. Payloads come from
+    `source` (see ingestion/sources.py), live Yahoo Finance by default.
+
+    Returns the number of rows written per table. Stage timings, retries and
+    failures are recorded in `stats` when given (see ingestion/telemetry.py).
+    """
+    if stats is None:
+        stats = RunStats("full")
+    with stats.timed("schema"):
+        for universe in universes:
+            ensure_index_table(conn, universe["table"])
+    if cache is None:
+        cache = open_default_cache()
+
+    # Fetches run concurrently; extraction stays on this thread
+    ticker_symbols = distinct_tickers(universes)
+    stats.ticker_count = len(ticker_symbols)
+    records = {}
+    names = {}
+    progress_bar = tqdm(total=len(ticker_symbols), desc="Processing tickers", unit="ticker")
+    fetched = fetch_all(ticker_symbols, max_workers=max_workers, cache=cache, offline=offline,
+                        stats=stats, source=source)
+    for ticker_symbol, fundamentals, error in fetched:
+        progress_bar.update(1)
+        progress_bar.set_postfix_str(f"Processed {ticker_symbol}")
+        try:
+            if error is not None:
+                raise error
+            with stats.timed("extract", ticker_symbol):
+                records[ticker_symbol] = extract_fundamentals(
+                    fundamentals["financials"], fundamentals["balance_sheet"], fundamentals["info"]
+                )
+            name = fundamentals["info"].get("longName") or fundamentals["info"].get("shortName")
+            if name:
+                names[ticker_symbol] = name
+        except Exception as e:
+            stats.failed(ticker_symbol, e)
+            print(f"An error occurred for ticker {ticker_symbol}: {e}")
+    progress_bar.close()
+
+    if not records:
+        return {universe["table"]: 0 for universe in universes}
+
+    # Score every distinct ticker in one vectorized pass
+    with stats.timed("score"):
+        scored = score(pd.DataFrame.from_dict(records, orient="index"))
+    scored["company"] = scored.index
+    # Every row of a run belongs to the same snapshot, even if it crosses midnight
+    scored["as_of"] = date.today()
+
+    for row in scored.itertuples(index=False):
+        # Print out the result for current ticker
+        print(f"Ticker: {row.company}, Intrinsic Value: {row.intrinsic_value}, Stock Price: {row.stock_price}, Margin of Safety: {row.margin_of_safety}, Rating: {row.rating}")
+
+    # Fan the rows out to every table and to the snapshot history;
+    # batches are flushed but only committed at the end
+    written = {}
+    try:
+        with conn.cursor() as cursor:
+            ensure_snapshot_partition(cursor, scored["as_of"].iloc[0].year)
+        # Names first: the load notification below tells the API to rebuild its search index
+        companies = BatchWriter(conn, COMPANY_TABLE, COMPANY_COLUMNS, COMPANY_KEY, flush_size=flush_size)
+        with stats.timed("db_write"):
+            for symbol, name in names.items():
+                companies.add({"company": symbol, "name": name})
+            companies.flush()
+        for universe in universes:
+            rows = scored[scored.index.isin(universe["tickers"])].copy()
+            rows["rating"] *= universe["rating_scale"]
+            rows["index_name"] = universe["table"]
+            writer = BatchWriter(conn, universe["table"], flush_size=flush_size)
+            history = BatchWriter(conn, SNAPSHOT_TABLE, SNAPSHOT_COLUMNS, SNAPSHOT_KEY, flush_size=flush_size)
+            with stats.timed("db_write"):
+                for row in rows.to_dict("records"):
+                    writer.add(row)
+                    history.add(row)
+                writer.flush()
+                history.flush()
+            # The previous snapshot is already in the history table; rank the new one
+            with conn.cursor() as cursor:
+                with stats.timed("db_prune"):
+                    prune_index_table(cursor, universe["table"])
+                with stats.timed("db_rankings"):
+                    refresh_rankings(cursor, universe["table"])
+            publish_load(conn, universe["table"])
+            written[universe["table"]] = writer.written
+        # Publish the whole run at once
+        with stats.timed("db_commit"):
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return written
@@ -0,0 +1,162 @@
+# ingestion/fetch.py
+# Bounded-concurrency fetch stage for the yfinance fundamentals
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ingestion.sources import YAHOO_HOST, MissingPayload, YFinanceSource
+
+# Tunables, overridable from the environment
+MAX_WORKERS = int(os.environ.get("INGEST_MAX_WORKERS", 8))
+RATE_LIMIT = float(os.environ.get("INGEST_RATE_LIMIT", 5.0))  # requests per second per host
+MAX_RETRIES = int(os.environ.get("INGEST_MAX_RETRIES", 3))
+BACKOFF_SECONDS = float(os.environ.get("INGEST_BACKOFF_SECONDS", 1.0))
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per second."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0  # Rate limiting disabled
+        started_at = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - started_at
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# One limiter per host, shared by every worker thread
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(host: str, rate: float = RATE_LIMIT) -> RateLimiter:
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(rate)
+        return _limiters[host]
+
+
+def call_with_retry(func, host: str = YAHOO_HOST, retries: int = MAX_RETRIES, backoff: float = BACKOFF_SECONDS,
+                    stats=None, stage: str = "fetch"):
+    """
+    Call `func` behind the host rate limit, retrying with exponential backoff.
+
+    With `stats` (a telemetry.RunStats), retries are counted under `stage` and
+    the time spent waiting on the rate limit is recorded as rate_limit_wait.
+    A MissingPayload is raised at once: no retry can produce it.
+    """
+    limiter = get_limiter(host)
+    attempt = 0
+    while True:
+        waited = limiter.acquire()
+        if stats is not None:
+            stats.record("rate_limit_wait", waited)
+        try:
+            return func()
+        except MissingPayload:
+            raise
+        except Exception as e:
+            if attempt >= retries:
+                raise
+            if stats is not None:
+                stats.retried(stage, e)
+            # Exponential backoff with jitter so the workers don't retry in lockstep
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+            attempt += 1
+
+
+def _cached(cache, ticker_symbol: str, kind: str, fetch, offline: bool, stats=None, host: str = YAHOO_HOST):
+    """
+    Serve `kind` from the cache while fresh, otherwise fetch and store it.
+
+    With `stats` (a telemetry.RunStats) the call is timed as fetch_<kind>,
+    rate limit waits included.
+    """
+    started_at = time.perf_counter()
+    try:
+        if cache is not None:
+            payload = cache.get(ticker_symbol, kind, allow_stale=offline)
+            if payload is not None:
+                if stats is not None:
+                    stats.cache_hit(kind)
+                return payload
+        if offline:
+            raise LookupError(f"No cached {kind} for {ticker_symbol}")
+        payload = call_with_retry(fetch, host, stats=stats, stage=f"fetch_{kind}")
+        if cache is not None:
+            cache.put(ticker_symbol, kind, payload)
+        return payload
+    finally:
+        if stats is not None:
+            stats.record(f"fetch_{kind}", time.perf_counter() - started_at, ticker_symbol)
+
+
+def fetch_fundamentals(ticker_symbol: str, cache=None, offline: bool = False, stats=None, source=None) -> dict:
+    """
+    Fetch the three raw payloads the scoring needs for one ticker from `source`.
+
+    With a cache, only stale payloads are requested again. The price has its own
+    short TTL and is refreshed with a lightweight quote call, so a warm cache
+    costs one request per ticker. With offline=True nothing is fetched and stale
+    entries are served as they are. `source` defaults to live Yahoo Finance
+    (see ingestion/sources.py).
+    """
+    if source is None and not offline:
+        source = YFinanceSource()
+    host = YAHOO_HOST if source is None else source.host
+    financials = _cached(cache, ticker_symbol, "financials", lambda: source.financials(ticker_symbol), offline, stats, host)
+    balance_sheet = _cached(cache, ticker_symbol, "balance_sheet", lambda: source.balance_sheet(ticker_symbol), offline, stats, host)
+
+    info = cache.get(ticker_symbol, "info", allow_stale=offline) if cache is not None else None
+    if info is None:
+        # A freshly fetched info blob carries the current price already
+        info = _cached(cache, ticker_symbol, "info", lambda: source.info(ticker_symbol), offline, stats, host)
+        if cache is not None and info.get("currentPrice") is not None:
+            cache.put(ticker_symbol, "price", info["currentPrice"])
+    else:
+        # Cached info may hold an old price; refresh just the price with a quote call
+        price = _cached(cache, ticker_symbol, "price", lambda: source.price(ticker_symbol), offline, stats, host)
+        info = {**info, "currentPrice": price}
+
+    return {"financials": financials, "balance_sheet": balance_sheet, "info": info}
+
+
+def fetch_all(ticker_symbols, max_workers: int = MAX_WORKERS, cache=None, offline: bool = False, stats=None,
+              source=None):
+    """
+    Fetch fundamentals for every ticker on a bounded thread pool.
+
+    Yields (ticker_symbol, fundamentals, error) tuples in completion order;
+    exactly one of fundamentals / error is None.
+    """
+    if source is None and not offline:
+        source = YFinanceSource()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_fundamentals, symbol, cache, offline, stats, source): symbol
+            for symbol in ticker_symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                yield symbol, future.result(), None
+            except Exception as e:
+                yield symbol, None, e
@@ -0,0 +1,103 @@
+# ingestion/prices.py
+# Incremental price-only refresh of the index tables
+
+from datetime import date
+
+import pandas as pd
+
+from ingestion.fetch import call_with_retry
+from ingestion.schema import (
+    SNAPSHOT_TABLE, ensure_index_table, ensure_snapshot_partition, latest_view, prune_index_table, publish_load,
+    refresh_rankings,
+)
+from ingestion.scoring import METRIC_FIELDS, score_metrics
+from ingestion.sources import YFinanceSource
+from ingestion.telemetry import RunStats
+from ingestion.writer import SNAPSHOT_COLUMNS, SNAPSHOT_KEY, BatchWriter
+
+
+def download_prices(ticker_symbols, stats=None, source=None) -> dict:
+    """Latest close of every ticker, fetched from `source` (live Yahoo Finance by default) in one request."""
+    if source is None:
+        source = YFinanceSource()
+    return call_with_retry(lambda: source.prices(list(ticker_symbols)), source.host, stats=stats, stage="fetch_prices")
+
+
+def refresh_prices(conn, universes, stats: RunStats = None, source=None) -> dict:
+    """
+    Record today's snapshot of every stored company from fresh prices.
+
+    Prices for every stored company across `universes` come from one download.
+    The latest stored metrics are rescored against them with the vectorized
+    model and upserted as the snapshot of today, into the index table and the
+    history, all in a single transaction. Earlier snapshots are never
+    rewritten: the fundamentals of a price-only snapshot are carried over from
+    the snapshot before it.
+
+    Returns the number of rows written per table; stage timings go into `stats`.
+    Prices come from `source` (see ingestion/sources.py), live by default.
+    """
+    if stats is None:
+        stats = RunStats("prices")
+    stored = {}
+    for universe in universes:
+        table = universe["table"]
+        with stats.timed("schema"):
+            ensure_index_table(conn, table)
+        with stats.timed("db_read"), conn.cursor() as cursor:
+            cursor.execute(f"SELECT company, as_of, {', '.join(METRIC_FIELDS)} FROM {latest_view(table)}")
+            stored[table] = pd.DataFrame(cursor.fetchall(), columns=["company", "as_of"] + METRIC_FIELDS)
+
+    companies = list(dict.fromkeys(symbol for rows in stored.values() for symbol in rows["company"]))
+    stats.ticker_count = len(companies)
+    prices = {}
+    if companies:
+        with stats.timed("fetch_prices"):
+            prices = download_prices(companies, stats=stats, source=source)
+    for symbol in companies:
+        if symbol not in prices:
+            stats.failed(symbol, LookupError(f"No price for {symbol}"))
+
+    # Every row of a refresh belongs to the same snapshot, even if it crosses midnight
+    today = date.today()
+    updated = {}
+    try:
+        with conn.cursor() as cursor:
+            ensure_snapshot_partition(cursor, today.year)
+        for universe in universes:
+            table = universe["table"]
+            rows = stored[table]
+            rows = rows[rows["company"].isin(prices)].copy()
+            updated[table] = len(rows)
+            if rows.empty:
+                continue
+            rows[METRIC_FIELDS] = rows[METRIC_FIELDS].astype(float)
+            rows["stock_price"] = rows["company"].map(prices)
+
+            with stats.timed("score"):
+                scores = score_metrics(rows)
+                rows["margin_of_safety"] = scores["margin_of_safety"]
+                rows["rating"] = scores["rating"] * universe["rating_scale"]
+
+            rows["as_of"] = today
+            rows["index_name"] = table
+            writer = BatchWriter(conn, table)
+            history = BatchWriter(conn, SNAPSHOT_TABLE, SNAPSHOT_COLUMNS, SNAPSHOT_KEY)
+            with stats.timed("db_write"):
+                for row in rows.to_dict("records"):
+                    writer.add(row)
+                    history.add(row)
+                writer.flush()
+                history.flush()
+            with stats.timed("db_prune"), conn.cursor() as cursor:
+                prune_index_table(cursor, table)
+            # Price, margin of safety and rating ranks moved with the prices
+            with stats.timed("db_rankings"), conn.cursor() as cursor:
+                refresh_rankings(cursor, table)
+            publish_load(conn, table)
+        with stats.timed("db_commit"):
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return updated
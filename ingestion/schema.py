@@ -0,0 +1,219 @@
+# ingestion/schema.py
+# Managed schema for the SP500 / Nasdaq100 index tables
+
+# Numeric columns the API can filter and sort on, each backed by a btree index
+SCREEN_COLUMNS = [
+    "stock_price", "intrinsic_value", "margin_of_safety", "rating",
+    "gross_profit_margin", "return_on_equity", "roic", "sga_to_revenue",
+    "debt_to_equity", "current_ratio", "cash_ratio", "quick_ratio", "roa",
+]
+
+# Metrics where a lower value ranks better; every other metric ranks highest first
+RANK_ASCENDING = {"sga_to_revenue", "debt_to_equity"}
+
+# Channel the API listens on to drop its cached index responses
+LOAD_CHANNEL = "index_loaded"
+
+# Append-only history of every snapshot of every index table, partitioned by year of as_of
+SNAPSHOT_TABLE = "index_snapshot"
+
+# Display name of every company any index table holds, for the search endpoint
+COMPANY_TABLE = "company_info"
+
+
+def latest_view(table: str) -> str:
+    """Name of the view holding the newest snapshot of every company in `table`."""
+    return f"{table}_latest"
+
+
+def rankings_view(table: str) -> str:
+    """Name of the materialized view ranking the latest snapshot of `table` per metric."""
+    return f"{table}_rankings"
+
+
+def ensure_index_table(conn, table: str):
+    """
+    Create or migrate an index table to the keyed snapshot layout.
+
+    Each row is keyed by (company, as_of) so reruns on the same day update the
+    existing snapshot instead of appending duplicates. Tables created by the
+    old loaders are migrated in place: their rows are stamped with today's date
+    and duplicates are dropped, keeping the most recently inserted row.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            company VARCHAR(10) NOT NULL,
+            stock_price NUMERIC,
+            intrinsic_value NUMERIC,
+            margin_of_safety NUMERIC,
+            rating NUMERIC,
+            gross_profit_margin NUMERIC,
+            return_on_equity NUMERIC,
+            roic NUMERIC,
+            sga_to_revenue NUMERIC,
+            debt_to_equity NUMERIC,
+            current_ratio NUMERIC,
+            cash_ratio NUMERIC,
+            quick_ratio NUMERIC,
+            roa NUMERIC,
+            as_of DATE NOT NULL DEFAULT CURRENT_DATE
+        )
+        """)
+
+        # Migrate tables created before the snapshot key existed
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS as_of DATE NOT NULL DEFAULT CURRENT_DATE")
+        cursor.execute(f"""
+        DELETE FROM {table} older USING {table} newer
+        WHERE older.company = newer.company
+          AND older.as_of = newer.as_of
+          AND older.ctid < newer.ctid
+        """)
+        cursor.execute(f"DELETE FROM {table} WHERE company IS NULL")
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN company SET NOT NULL")
+
+        # Unique snapshot key; also answers "newest as_of for this company" in one probe
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_company_as_of_key ON {table} (company, as_of DESC)")
+
+        # Screener filters and sorts (e.g. roic > 30 ORDER BY rating DESC LIMIT 20)
+        for column in SCREEN_COLUMNS:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column}_idx ON {table} ({column})")
+
+        # The API reads the newest snapshot per company through this view. The
+        # newest-row check is a correlated probe of the key index rather than a
+        # DISTINCT ON, so filters and ORDER BY on the view still reach the
+        # metric indexes of the table.
+        cursor.execute(f"""
+        CREATE OR REPLACE VIEW {latest_view(table)} AS
+        SELECT *
+        FROM {table}
+        WHERE as_of = (
+            SELECT max(newest.as_of) FROM {table} newest WHERE newest.company = {table}.company
+        )
+        """)
+
+        # Data version per table, bumped by every load (see publish_load)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS index_version (
+            table_name TEXT PRIMARY KEY,
+            version BIGINT NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """)
+
+        # Company names, shared by every index table
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {COMPANY_TABLE} (
+            company VARCHAR(10) PRIMARY KEY,
+            name TEXT NOT NULL
+        )
+        """)
+
+        # Move any older snapshots into the history table, leaving the latest per company
+        ensure_snapshot_table(cursor)
+        cursor.execute(f"SELECT DISTINCT extract(year FROM as_of)::int FROM {table}")
+        for (year,) in cursor.fetchall():
+            ensure_snapshot_partition(cursor, year)
+        cursor.execute(f"""
+        INSERT INTO {SNAPSHOT_TABLE} (index_name, company, as_of, {', '.join(SCREEN_COLUMNS)})
+        SELECT %s, company, as_of, {', '.join(SCREEN_COLUMNS)} FROM {table}
+        ON CONFLICT (index_name, company, as_of) DO NOTHING
+        """, (table,))
+        prune_index_table(cursor, table)
+
+        ensure_rankings_view(cursor, table)
+    conn.commit()
+
+
+def ensure_rankings_view(cursor, table: str):
+    """
+    Create the materialized view of per-metric ranks and percentiles of `table`.
+
+    One row per (metric, company) with a known value: rank 1 is the best value
+    (highest, or lowest for RANK_ASCENDING metrics) and percentile is the share
+    of companies ranked below it, from 0 to 100. The unique (metric, company)
+    index is what REFRESH ... CONCURRENTLY needs; (metric, rank) turns a top-N
+    request into a short index range scan.
+    """
+    view = rankings_view(table)
+    selects = []
+    for column in SCREEN_COLUMNS:
+        best_first = "ASC" if column in RANK_ASCENDING else "DESC"
+        worst_first = "DESC" if column in RANK_ASCENDING else "ASC"
+        selects.append(f"""
+        SELECT '{column}'::text AS metric, company, as_of, {column} AS value,
+               rank() OVER (ORDER BY {column} {best_first}) AS rank,
+               100 * percent_rank() OVER (ORDER BY {column} {worst_first}) AS percentile,
+               count(*) OVER () AS ranked
+        FROM {latest_view(table)}
+        WHERE {column} IS NOT NULL AND {column} <> 'NaN'
+        """)
+    cursor.execute(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS {' UNION ALL '.join(selects)}")
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {view}_metric_company_key ON {view} (metric, company)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {view}_metric_rank_idx ON {view} (metric, rank, company)")
+
+
+def refresh_rankings(cursor, table: str):
+    """
+    Recompute the rankings of `table` from its current rows.
+
+    CONCURRENTLY lets the API keep reading the old rankings until the load
+    transaction commits, instead of blocking on an exclusive lock.
+    """
+    cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {rankings_view(table)}")
+
+
+def ensure_snapshot_table(cursor):
+    """
+    Create the history table every load appends its snapshot to.
+
+    Rows are keyed by (index_name, company, as_of) and range partitioned by
+    year, so a company's history is one index probe per partition and old
+    years can be detached or dropped without touching the current ones.
+    """
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SNAPSHOT_TABLE} (
+        index_name TEXT NOT NULL,
+        company VARCHAR(10) NOT NULL,
+        as_of DATE NOT NULL,
+        {', '.join(f"{column} NUMERIC" for column in SCREEN_COLUMNS)},
+        PRIMARY KEY (index_name, company, as_of)
+    ) PARTITION BY RANGE (as_of)
+    """)
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {SNAPSHOT_TABLE}_company_as_of_idx ON {SNAPSHOT_TABLE} (company, as_of)")
+
+
+def ensure_snapshot_partition(cursor, year: int):
+    """Create the partition holding the snapshots of `year`."""
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SNAPSHOT_TABLE}_{year} PARTITION OF {SNAPSHOT_TABLE}
+    FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')
+    """)
+
+
+def prune_index_table(cursor, table: str):
+    """
+    Drop all but the newest snapshot of every company from `table`.
+
+    Older snapshots live on in the history table, so the table behind the
+    _latest view stays one row per company however long the loader runs.
+    """
+    cursor.execute(f"""
+    DELETE FROM {table} older USING {table} newer
+    WHERE older.company = newer.company AND older.as_of < newer.as_of
+    """)
+
+
+def publish_load(conn, table: str):
+    """
+    Bump the data version of `table` and notify listeners.
+
+    Call inside the load transaction: the version row commits with the data,
+    and Postgres only delivers the NOTIFY once that transaction commits.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        INSERT INTO index_version (table_name, version, updated_at) VALUES (%s, 1, now())
+        ON CONFLICT (table_name) DO UPDATE SET version = index_version.version + 1, updated_at = now()
+        """, (table,))
+        cursor.execute("SELECT pg_notify(%s, %s)", (LOAD_CHANNEL, table))
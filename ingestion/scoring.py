@@ -0,0 +1,217 @@
+# ingestion/scoring.py
+# Vectorized rating model shared by the loaders and the calculator
+#
+# Every function takes either a pandas DataFrame or a mapping of column name to
+# array-like (a dict of scalars works for a single company) and computes all rows
+# at once with NumPy. Missing columns and None values are read as NaN; any
+# metric that comes out NaN or +/-inf is reported as NaN and earns no points.
+# Only NumPy is required; pandas is used when a DataFrame is passed in.
+
+import numpy as np
+
+# Set a static expected growth rate
+EXPECTED_GROWTH = 8.0
+# Assumed AAA corporate bond yield for the Graham formula
+CORPORATE_BOND_YIELD = 4.6
+# Tax rate used for NOPAT when yfinance has no effective rate
+DEFAULT_TAX_RATE = 0.21
+
+# Raw fundamentals the model reads, as produced by extract_fundamentals
+FUNDAMENTAL_FIELDS = [
+    "revenue", "cost_of_goods_sold", "net_income", "share_holder_equity", "sga_and_a",
+    "total_debt", "current_asset", "current_liability", "cash_and_cash_equivalents",
+    "operating_income", "tax_rate", "total_assets", "current_liabilities",
+    "earnings_per_share", "growth_rate", "corporate_bond_yield", "stock_price",
+    "quick_ratio", "roa",
+]
+
+# Metrics stored in the index tables, computed by compute_metrics
+METRIC_FIELDS = [
+    "stock_price", "intrinsic_value", "gross_profit_margin", "return_on_equity", "roic",
+    "sga_to_revenue", "debt_to_equity", "current_ratio", "cash_ratio", "quick_ratio", "roa",
+]
+
+# Scoring thresholds; pass a modified copy to score_metrics to rescore
+THRESHOLDS = {
+    "gross_profit_margin": 40,  # a += 1 above
+    "return_on_equity": 20,  # a += 1 above
+    "roic": 30,  # a += 1 above
+    "sga_to_revenue": 30,  # a += 1 below
+    "debt_to_equity": 0.8,  # b += 1 below
+    "current_ratio": 1.5,  # counts towards liquidity above
+    "cash_ratio": 1,  # counts towards liquidity above
+    "quick_ratio": 1,  # counts towards liquidity above
+    "roa": 10,  # b += 1 above
+    "margin_of_safety": 0.4,  # margin of safety that earns the full value score
+}
+
+# Points added to b for 0, 1, 2 or 3 passing liquidity ratios
+LIQUIDITY_POINTS = np.array([0, 0.25, 0.5, 1])
+
+
+def _value(row, key):
+    """Most recent value of a statement line, or 0 when the line is missing."""
+    return row.loc[key].values[0] if key in row.index else 0
+
+
+def extract_fundamentals(financials, balance_sheet, info) -> dict:
+    """Pull the model inputs for one ticker out of the raw yfinance payloads."""
+    # Division by zero here yields inf / NaN, which compute_metrics maps to NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quick_ratio = None
+        if all(key in balance_sheet.index for key in ["Current Assets", "Inventory", "Current Liabilities"]):
+            quick_ratio = (_value(balance_sheet, "Current Assets") - _value(balance_sheet, "Inventory")) / _value(balance_sheet, "Current Liabilities")
+
+        roa = None
+        if "Net Income" in financials.index and "Total Assets" in balance_sheet.index:
+            roa = (_value(financials, "Net Income") / _value(balance_sheet, "Total Assets")) * 100
+
+    return {
+        "revenue": _value(financials, "Total Revenue"),
+        "cost_of_goods_sold": _value(financials, "Cost Of Revenue"),
+        "net_income": _value(financials, "Net Income"),
+        "share_holder_equity": _value(balance_sheet, "Stockholders Equity"),
+        "sga_and_a": _value(financials, "Selling General And Administration"),
+        "total_debt": _value(balance_sheet, "Total Debt"),
+        "current_asset": _value(balance_sheet, "Total Assets"),
+        "current_liability": _value(balance_sheet, "Total Liabilities Net Minority Interest"),
+        "cash_and_cash_equivalents": _value(balance_sheet, "Cash And Cash Equivalents"),
+        "operating_income": _value(financials, "Operating Income"),
+        "tax_rate": info.get("effectiveTaxRate"),
+        "total_assets": _value(balance_sheet, "Total Assets"),
+        "current_liabilities": _value(balance_sheet, "Current Liabilities"),
+        "earnings_per_share": info.get("trailingEps"),
+        "growth_rate": EXPECTED_GROWTH,
+        "corporate_bond_yield": CORPORATE_BOND_YIELD,
+        "stock_price": info.get("currentPrice"),
+        "quick_ratio": quick_ratio,
+        "roa": roa,
+    }
+
+
+def _columns(data, names):
+    """Read `names` from `data` as equally sized float arrays (NaN where missing)."""
+    values = {}
+    for name in names:
+        value = data[name] if name in data else np.nan
+        values[name] = np.asarray(value, dtype=float)
+    arrays = np.broadcast_arrays(*values.values())
+    return {name: np.atleast_1d(array).astype(float) for name, array in zip(values, arrays)}
+
+
+def _divide(numerator, denominator, when_zero=0.0):
+    """Elementwise division returning `when_zero` for zero denominators."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = numerator / np.where(denominator == 0, np.nan, denominator)
+    return np.where(denominator == 0, when_zero, result)
+
+
+def _finite(values):
+    """Map +/-inf to NaN so every invalid metric looks the same downstream."""
+    return np.where(np.isfinite(values), values, np.nan)
+
+
+def _output(data, columns):
+    """Return a DataFrame for DataFrame input, a dict of arrays otherwise."""
+    if hasattr(data, "index") and hasattr(data, "columns"):
+        import pandas as pd
+        return pd.DataFrame(columns, index=data.index)
+    return columns
+
+
+def compute_metrics(data):
+    """Compute every stored metric from raw fundamentals (see FUNDAMENTAL_FIELDS)."""
+    f = _columns(data, FUNDAMENTAL_FIELDS)
+
+    # Unknown rates fall back to the model defaults
+    tax_rate = np.where(np.isnan(f["tax_rate"]), DEFAULT_TAX_RATE, f["tax_rate"])
+    growth_rate = np.where(np.isnan(f["growth_rate"]), EXPECTED_GROWTH, f["growth_rate"])
+    bond_yield = np.where(np.isnan(f["corporate_bond_yield"]), CORPORATE_BOND_YIELD, f["corporate_bond_yield"])
+
+    # ROIC from NOPAT over invested capital
+    nopat = f["operating_income"] * (1 - tax_rate)
+    invested_capital = f["total_assets"] - f["current_liabilities"] - f["cash_and_cash_equivalents"]
+    roic = _divide(nopat, invested_capital) * 100
+
+    # Graham intrinsic value; no EPS means no value
+    intrinsic_value = f["earnings_per_share"] * (8.5 + 2 * growth_rate) * 4.4 / bond_yield
+    intrinsic_value = np.nan_to_num(_finite(intrinsic_value), nan=0.0)
+
+    metrics = {
+        "stock_price": f["stock_price"],
+        "intrinsic_value": intrinsic_value,
+        "gross_profit_margin": _divide(f["revenue"] - f["cost_of_goods_sold"], f["revenue"]) * 100,
+        "return_on_equity": _divide(f["net_income"], f["share_holder_equity"]) * 100,
+        "roic": roic,
+        "sga_to_revenue": _divide(f["sga_and_a"], f["revenue"], when_zero=np.nan) * 100,
+        "debt_to_equity": _divide(f["total_debt"], f["share_holder_equity"]),
+        "current_ratio": _divide(f["current_asset"], f["current_liability"]),
+        "cash_ratio": _divide(f["cash_and_cash_equivalents"], f["current_liability"]),
+        "quick_ratio": f["quick_ratio"],
+        "roa": f["roa"],
+    }
+    return _output(data, {name: _finite(values) for name, values in metrics.items()})
+
+
+def score_metrics(data, thresholds=THRESHOLDS):
+    """
+    Score already computed metrics (see METRIC_FIELDS).
+
+    Returns quality, margin_of_safety and rating columns. This needs no raw
+    fundamentals, so stored rows can be rescored after a threshold or price
+    change without fetching anything.
+    """
+    m = _columns(data, METRIC_FIELDS)
+
+    # Comparisons against NaN are False, so invalid metrics earn no points
+    with np.errstate(invalid="ignore"):
+        a = (
+            (m["gross_profit_margin"] > thresholds["gross_profit_margin"]).astype(float)
+            + (m["return_on_equity"] > thresholds["return_on_equity"])
+            + (m["roic"] > thresholds["roic"])
+            + (m["sga_to_revenue"] < thresholds["sga_to_revenue"])
+        )
+        liquidity = (
+            (m["current_ratio"] > thresholds["current_ratio"]).astype(int)
+            + (m["cash_ratio"] > thresholds["cash_ratio"])
+            + (m["quick_ratio"] > thresholds["quick_ratio"])
+        )
+        b = (
+            (m["debt_to_equity"] < thresholds["debt_to_equity"]).astype(float)
+            + LIQUIDITY_POINTS[liquidity]
+            + (m["roa"] > thresholds["roa"])
+        )
+    quality = (a + b) / 8
+
+    # Margin of safety only exists for a positive intrinsic value
+    intrinsic_value = m["intrinsic_value"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin_of_safety = np.where(intrinsic_value > 0, (intrinsic_value - m["stock_price"]) / intrinsic_value, np.nan)
+    margin_of_safety = _finite(margin_of_safety)
+
+    # Normalize the margin of safety to [0, 1]; invalid counts as 0
+    normalized_value = np.clip(np.nan_to_num(margin_of_safety, nan=0.0) / thresholds["margin_of_safety"], 0, 1)
+
+    return _output(data, {
+        "quality": quality,
+        "margin_of_safety": margin_of_safety,
+        "rating": (normalized_value * 0.5) + (quality * 0.5),
+    })
+
+
+def score(data, thresholds=THRESHOLDS):
+    """Compute all metrics and the rating from raw fundamentals in one pass."""
+    metrics = compute_metrics(data)
+    scores = score_metrics(metrics, thresholds)
+    if hasattr(metrics, "join"):
+        return metrics.join(scores)
+    return {**metrics, **scores}
+
+
+def score_one(fundamentals: dict, thresholds=THRESHOLDS) -> dict:
+    """Score a single company; NaN results are returned as None."""
+    result = score(fundamentals, thresholds)
+    return {
+        name: (None if np.isnan(values[0]) else float(values[0]))
+        for name, values in result.items()
+    }
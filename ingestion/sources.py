@@ -0,0 +1,203 @@
+# ingestion/sources.py
+# Data sources behind the loaders: live Yahoo Finance, or payloads recorded to disk and replayed
+
+import os
+import random
+import time
+
+import pandas as pd
+
+from ingestion.cache import dump_payload, load_payload
+
+try:
+    import yfinance as yf  # Only needed by the live source; replays run without it
+except ImportError:
+    yf = None
+
+# Every yfinance call ends up on Yahoo Finance
+YAHOO_HOST = "finance.yahoo.com"
+
+# Where record writes and replay reads fixtures by default
+FIXTURES_PATH = os.environ.get("INGEST_FIXTURES_PATH", os.path.join("fixtures", "yfinance"))
+
+# Source names accepted by open_source / --source
+SOURCES = ["yfinance", "record", "replay"]
+
+
+class MissingPayload(LookupError):
+    """A source has nothing for this ticker and never will; retrying cannot help."""
+
+
+class YFinanceSource:
+    """
+    Live Yahoo Finance through yfinance.
+
+    Every source has the same methods: financials, balance_sheet and info
+    return one ticker's raw payloads, price its last price, prices the last
+    close of many tickers in one request. `host` names the rate limit the
+    calls go through (see fetch.call_with_retry).
+    """
+
+    host = YAHOO_HOST
+
+    def __init__(self):
+        if yf is None:
+            raise RuntimeError("yfinance is not installed; use --source replay to load from fixtures")
+
+    def financials(self, symbol: str):
+        return yf.Ticker(symbol).financials
+
+    def balance_sheet(self, symbol: str):
+        return yf.Ticker(symbol).balance_sheet
+
+    def info(self, symbol: str) -> dict:
+        return yf.Ticker(symbol).info
+
+    def price(self, symbol: str) -> float:
+        return yf.Ticker(symbol).fast_info["lastPrice"]
+
+    def prices(self, symbols: list) -> dict:
+        """Latest close of every ticker, fetched in one multi-ticker request."""
+        frame = yf.download(
+            list(symbols), period="5d", interval="1d", group_by="column",
+            auto_adjust=False, progress=False, threads=True,
+        )
+        closes = frame["Close"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(name=symbols[0])
+        # Last traded close per ticker, skipping days a ticker didn't trade
+        latest = closes.ffill().iloc[-1]
+        return {symbol: float(price) for symbol, price in latest.items() if pd.notna(price)}
+
+
+class FixtureStore:
+    """Raw payloads on disk as <root>/<kind>/<ticker>.json, serialized like the raw-data cache."""
+
+    def __init__(self, root: str = FIXTURES_PATH):
+        self.root = root
+
+    def path(self, kind: str, symbol: str) -> str:
+        return os.path.join(self.root, kind, f"{symbol}.json")
+
+    def load(self, kind: str, symbol: str):
+        try:
+            with open(self.path(kind, symbol)) as f:
+                return load_payload(kind, f.read())
+        except FileNotFoundError:
+            raise MissingPayload(f"No recorded {kind} for {symbol} in {self.root}") from None
+
+    def save(self, kind: str, symbol: str, payload):
+        path = self.path(kind, symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a replay never reads a half-written fixture
+        with open(path + ".tmp", "w") as f:
+            f.write(dump_payload(kind, payload))
+        os.replace(path + ".tmp", path)
+
+
+class RecordingSource:
+    """Passes calls through to `source` and saves every payload it returns to `store`."""
+
+    def __init__(self, source, store: FixtureStore):
+        self.source = source
+        self.store = store
+        self.host = source.host
+
+    def _record(self, kind: str, symbol: str, payload):
+        self.store.save(kind, symbol, payload)
+        return payload
+
+    def financials(self, symbol: str):
+        return self._record("financials", symbol, self.source.financials(symbol))
+
+    def balance_sheet(self, symbol: str):
+        return self._record("balance_sheet", symbol, self.source.balance_sheet(symbol))
+
+    def info(self, symbol: str) -> dict:
+        return self._record("info", symbol, self.source.info(symbol))
+
+    def price(self, symbol: str) -> float:
+        return self._record("price", symbol, self.source.price(symbol))
+
+    def prices(self, symbols: list) -> dict:
+        prices = self.source.prices(symbols)
+        for symbol, price in prices.items():
+            self.store.save("price", symbol, price)
+        return prices
+
+
+class ReplaySource:
+    """
+    Serves payloads recorded by RecordingSource, with simulated network latency.
+
+    Each call sleeps `latency` seconds plus up to `jitter` more. The jitter of
+    a call depends only on the seed, the payload kind and the ticker, so
+    replays are timed the same whatever order the fetch threads run in.
+    """
+
+    host = "replay"
+
+    def __init__(self, store: FixtureStore, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+
+    def _wait(self, kind: str, symbol: str):
+        delay = self.latency
+        if self.jitter > 0:
+            delay += random.Random(f"{self.seed}:{kind}:{symbol}").uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _replay(self, kind: str, symbol: str):
+        self._wait(kind, symbol)
+        return self.store.load(kind, symbol)
+
+    def financials(self, symbol: str):
+        return self._replay("financials", symbol)
+
+    def balance_sheet(self, symbol: str):
+        return self._replay("balance_sheet", symbol)
+
+    def info(self, symbol: str) -> dict:
+        return self._replay("info", symbol)
+
+    def _recorded_price(self, symbol: str):
+        try:
+            return self.store.load("price", symbol)
+        except MissingPayload:
+            # Tickers recorded by a full load only have the price inside their info
+            return self.store.load("info", symbol).get("currentPrice")
+
+    def price(self, symbol: str) -> float:
+        self._wait("price", symbol)
+        price = self._recorded_price(symbol)
+        if price is None:
+            raise MissingPayload(f"No recorded price for {symbol} in {self.store.root}")
+        return price
+
+    def prices(self, symbols: list) -> dict:
+        # One multi-ticker request, one wait
+        self._wait("prices", ",".join(symbols))
+        prices = {}
+        for symbol in symbols:
+            try:
+                price = self._recorded_price(symbol)
+            except MissingPayload:
+                continue
+            if price is not None:
+                prices[symbol] = float(price)
+        return prices
+
+
+def open_source(name: str = "yfinance", fixtures: str = FIXTURES_PATH, latency: float = 0.0,
+                jitter: float = 0.0, seed: int = 0):
+    """The source called `name` (see SOURCES); record and replay keep their fixtures under `fixtures`."""
+    if name == "yfinance":
+        return YFinanceSource()
+    if name == "record":
+        return RecordingSource(YFinanceSource(), FixtureStore(fixtures))
+    if name == "replay":
+        return ReplaySource(FixtureStore(fixtures), latency, jitter, seed)
+    raise ValueError(f"Unknown data source {name!r}; choose from {', '.join(SOURCES)}")
@@ -0,0 +1,195 @@
+# ingestion/telemetry.py
+# Per-stage timings, retries and failures of one ingestion run, for the run summary and JSON report
+
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Run-level summary of every load, one row per run (see record_run)
+RUN_TABLE = "ingest_run"
+
+
+class RunStats:
+    """
+    Timings and counters of one run, safe to update from the fetch threads.
+
+    Stages timed per ticker (fetch_financials, fetch_balance_sheet, fetch_info,
+    fetch_price, extract) are kept per ticker as well as in aggregate; stages
+    that work on the whole universe at once (score, db_write, ...) and the
+    rate limit waits only in aggregate.
+    """
+
+    def __init__(self, mode: str, source: str = "yfinance"):
+        self.mode = mode
+        self.source = source  # Data source name, see ingestion/sources.py
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self.lock = threading.Lock()
+        self.stages = defaultdict(list)
+        self.tickers = defaultdict(dict)
+        self.retries = Counter()
+        self.retry_errors = Counter()
+        self.cache_hits = Counter()
+        self.failures = Counter()
+        self.failed_tickers = {}
+        self.ticker_count = None  # Tickers the run set out to load, when known
+        self.rows_written = {}
+        self.error = None
+
+    def record(self, stage: str, seconds: float, ticker: str = None):
+        with self.lock:
+            self.stages[stage].append(seconds)
+            if ticker is not None:
+                self.tickers[ticker][stage] = seconds
+
+    @contextmanager
+    def timed(self, stage: str, ticker: str = None):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started_at, ticker)
+
+    def retried(self, stage: str, error: Exception):
+        with self.lock:
+            self.retries[stage] += 1
+            self.retry_errors[type(error).__name__] += 1
+
+    def cache_hit(self, kind: str):
+        with self.lock:
+            self.cache_hits[kind] += 1
+
+    def failed(self, ticker: str, error: Exception):
+        with self.lock:
+            self.failures[type(error).__name__] += 1
+            self.failed_tickers[ticker] = f"{type(error).__name__}: {error}"
+
+    def finish(self, rows_written: dict = None, error: Exception = None):
+        self.finished_at = datetime.now(timezone.utc)
+        self.rows_written = dict(rows_written or {})
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration(self) -> float:
+        end = self.finished_at or datetime.now(timezone.utc)
+        return (end - self.started_at).total_seconds()
+
+    def stage_summary(self) -> dict:
+        """count / total / mean / p50 / p95 / max seconds of every stage."""
+        summary = {}
+        for stage, samples in self.stages.items():
+            values = np.asarray(samples)
+            summary[stage] = {
+                "count": len(values),
+                "total": float(values.sum()),
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(values.max()),
+            }
+        return summary
+
+    def summary(self) -> dict:
+        """Run-level summary: what goes into the run table."""
+        tickers = self.ticker_count
+        if tickers is None:
+            tickers = len(self.tickers.keys() | self.failed_tickers.keys())
+        succeeded = tickers - len(self.failed_tickers)
+        return {
+            "mode": self.mode,
+            "source": self.source,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": self.duration,
+            "tickers": tickers,
+            "succeeded": succeeded,
+            "failed": len(self.failed_tickers),
+            "tickers_per_second": succeeded / self.duration if self.duration > 0 else 0.0,
+            "rows_written": self.rows_written,
+            "stages": self.stage_summary(),
+            "retries": dict(self.retries),
+            "retry_errors": dict(self.retry_errors),
+            "cache_hits": dict(self.cache_hits),
+            "failures": dict(self.failures),
+            "error": self.error,
+        }
+
+    def report(self) -> dict:
+        """Full report: the summary plus per-ticker timings and failure messages."""
+        return {**self.summary(), "per_ticker": dict(self.tickers), "failed_tickers": self.failed_tickers}
+
+    def write_report(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def format(self) -> str:
+        """Short human readable stage table for the end of a run."""
+        summary = self.summary()
+        lines = [
+            f"{summary['mode']} run from {summary['source']}: {summary['succeeded']}/{summary['tickers']} tickers in "
+            f"{summary['duration_seconds']:.1f}s ({summary['tickers_per_second']:.2f} tickers/s)"
+        ]
+        for stage, stats in sorted(summary["stages"].items(), key=lambda item: -item[1]["total"]):
+            lines.append(
+                f"  {stage:<20} n={stats['count']:<6} total={stats['total']:8.2f}s "
+                f"p50={1000 * stats['p50']:8.1f}ms p95={1000 * stats['p95']:8.1f}ms"
+            )
+        if summary["retries"]:
+            lines.append(f"  retries: {summary['retries']}")
+        if summary["failures"]:
+            lines.append(f"  failures: {summary['failures']}")
+        return "\n".join(lines)
+
+
+def ensure_run_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {RUN_TABLE} (
+            run_id SERIAL PRIMARY KEY,
+            mode TEXT NOT NULL,
+            started_at TIMESTAMPTZ NOT NULL,
+            finished_at TIMESTAMPTZ,
+            duration_seconds DOUBLE PRECISION,
+            tickers INTEGER,
+            succeeded INTEGER,
+            failed INTEGER,
+            tickers_per_second DOUBLE PRECISION,
+            error TEXT,
+            summary JSONB NOT NULL
+        )
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {RUN_TABLE}_started_at_idx ON {RUN_TABLE} (started_at DESC)")
+    conn.commit()
+
+
+def record_run(conn, stats: RunStats) -> int:
+    """
+    Store the summary of a finished run and return its run_id.
+
+    Runs in its own transaction after the load has committed or rolled back,
+    so failed runs are recorded too.
+    """
+    # A failed load leaves nothing worth keeping open; start from a clean transaction
+    conn.rollback()
+    ensure_run_table(conn)
+    summary = stats.summary()
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        INSERT INTO {RUN_TABLE} (mode, started_at, finished_at, duration_seconds, tickers, succeeded, failed,
+                                 tickers_per_second, error, summary)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        RETURNING run_id
+        """, (
+            stats.mode, stats.started_at, stats.finished_at, summary["duration_seconds"], summary["tickers"],
+            summary["succeeded"], summary["failed"], summary["tickers_per_second"], stats.error,
+            json.dumps(summary),
+        ))
+        run_id = cursor.fetchone()[0]
+    conn.commit()
+    return run_id
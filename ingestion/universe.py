@@ -0,0 +1,27 @@
+# ingestion/universe.py
+# Index universes loaded from the JSON files in universes/
+
+import json
+
+
+def load_universe(path: str) -> dict:
+    """
+    Read one universe config file.
+
+    A universe names the table it is stored in, the scale its ratings are
+    stored on (1 for 0-1, 100 for 0-100) and its ticker symbols.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    return {
+        "name": config.get("name", config["table"]),
+        "table": config["table"],
+        "rating_scale": float(config.get("rating_scale", 1)),
+        # Removing duplicates while keeping the file order
+        "tickers": list(dict.fromkeys(config["tickers"])),
+    }
+
+
+def distinct_tickers(universes) -> list:
+    """Every ticker across `universes`, each listed once."""
+    return list(dict.fromkeys(symbol for universe in universes for symbol in universe["tickers"]))
@@ -0,0 +1,80 @@
+# ingestion/writer.py
+# Batched writes of scored rows into an index table
+
+import math
+import os
+
+from psycopg2.extras import execute_values
+
+# Rows buffered before a multi-row INSERT is sent, overridable from the environment
+FLUSH_SIZE = int(os.environ.get("INGEST_FLUSH_SIZE", 500))
+
+# Columns of the SP500 / Nasdaq100 tables, in insert order
+INDEX_COLUMNS = [
+    "company", "as_of", "stock_price", "intrinsic_value", "margin_of_safety", "rating",
+    "gross_profit_margin", "return_on_equity", "roic", "sga_to_revenue",
+    "debt_to_equity", "current_ratio", "cash_ratio", "quick_ratio", "roa",
+]
+
+# Snapshot key of the index tables (see ingestion/schema.py)
+INDEX_KEY = ["company", "as_of"]
+
+# Columns and key of the snapshot history table, which tags each row with its index table
+SNAPSHOT_COLUMNS = ["index_name"] + INDEX_COLUMNS
+SNAPSHOT_KEY = ["index_name", "company", "as_of"]
+
+# Columns and key of the company name table
+COMPANY_COLUMNS = ["company", "name"]
+COMPANY_KEY = ["company"]
+
+
+def _sql_value(value):
+    """Store NaN / inf metrics as NULL."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class BatchWriter:
+    """
+    Buffer rows and flush them with execute_values.
+
+    When `conflict_columns` is given, rows are upserted on that key instead of
+    appended, which makes reruns idempotent. Nothing is committed until
+    commit() is called, so a whole run lands in a single transaction and
+    readers never see a half-loaded table.
+    """
+
+    def __init__(self, conn, table: str, columns=INDEX_COLUMNS, conflict_columns=INDEX_KEY,
+                 flush_size: int = FLUSH_SIZE):
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.flush_size = flush_size
+        self.sql = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES %s"
+        if conflict_columns:
+            updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in self.columns if column not in conflict_columns)
+            self.sql += f" ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {updates}"
+        self.rows = []
+        self.written = 0
+
+    def add(self, row: dict):
+        self.rows.append(tuple(_sql_value(row.get(column)) for column in self.columns))
+        if len(self.rows) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        with self.conn.cursor() as cursor:
+            execute_values(cursor, self.sql, self.rows, page_size=self.flush_size)
+        self.written += len(self.rows)
+        self.rows = []
+
+    def commit(self):
+        self.flush()
+        self.conn.commit()
+
+    def rollback(self):
+        self.rows = []
+        self.conn.rollback()
@@ -26,6 +26,18 @@ import DeleteIcon from '@mui/icons-material/Delete';
 import WarningIcon from '@mui/icons-material/Warning';
 import Divider from "@mui/material/Divider";
 
+// Calculation history rows fetched per page
+const HISTORY_PAGE_SIZE = 50;
+
+// Inputs that are rates or ratios rather than amounts, in the units the server's model expects
+// (the same as the index loaders: ROA and growth in percent, tax rate as a fraction)
+const INPUT_UNITS = {
+  growth_rate: { unit: "%", example: "8 for 8%" },
+  tax_rate: { unit: "fraction", example: "0.21 for 21%" },
+  quick_ratio: { unit: "x", example: "1.2" },
+  roa: { unit: "%", example: "12 for 12%" },
+};
+
 const Calculator = () => {
   const router = useRouter(); // Use useRouter for redirection
   const isLoggedIn = useBearStore((state) => state.isLoggedIn);
@@ -70,9 +82,9 @@ const Calculator = () => {
   
       if (response.ok) {
         console.log("Delete request successful");
-        setHistory(prevHistory => prevHistory.filter((record) => record.id !== calculationToDelete));
+        // Drop the row in place so the pages loaded so far stay put
+        setHistory(prevHistory => prevHistory.filter((record) => record.history_id !== calculationToDelete));
         handleDeleteClose();
-        fetchHistory();
       } else {
         const errorData = await response.json();
         setDeleteError(errorData.detail || "Failed to delete calculation");
@@ -99,6 +111,10 @@ const Calculator = () => {
     current_asset: "",
     current_liability: "",
     cash_and_cash_equivalents: "",
+    operating_income: "",
+    tax_rate: "",
+    total_assets: "",
+    current_liabilities: "",
     quick_ratio: "",
     roa: "",
   });
@@ -110,21 +126,36 @@ const Calculator = () => {
   });
 
   const [searchTerm, setSearchTerm] = useState("");
-  const [sortConfig, setSortConfig] = useState({ key: "company_name", direction: "asc" });
+  const [sortConfig, setSortConfig] = useState({ key: "created_at", direction: "desc" });
+  const [nextCursor, setNextCursor] = useState(null);
 
   useEffect(() => {
     if (!isLoggedIn) {
       router.push("/login");
     } else {
-      fetchHistory(); // Fetch history when the component loads
+      fetchHistory(); // Fetch history when the component loads and when search or sort change
     }
-  }, [isLoggedIn, router]);
+  }, [isLoggedIn, router, searchTerm, sortConfig]);
 
-  const fetchHistory = async () => {
+  // Search, sort and pagination run on the server; pass a cursor to append the next page
+  const fetchHistory = async (cursor = null) => {
     try {
-      const res = await axios.get(`/api/calculation/${user_id}`);
-      setHistory(res.data);
+      const params = {
+        order_by: sortConfig.key,
+        order: sortConfig.direction,
+        limit: HISTORY_PAGE_SIZE,
+      };
+      if (searchTerm) params.q = searchTerm;
+      if (cursor) params.cursor = cursor;
+      const res = await axios.get(`/api/calculation/${user_id}`, { params });
+      setHistory((prevHistory) => (cursor ? [...prevHistory, ...res.data] : res.data));
+      setNextCursor(res.headers["x-next-cursor"] || null);
     } catch (err) {
+      if (err.response && err.response.status === 404) {
+        setHistory([]);
+        setNextCursor(null);
+        return;
+      }
       console.error("Failed to fetch history", err);
     }
   };
@@ -146,121 +177,28 @@ const Calculator = () => {
     setSortConfig({ key, direction });
   };
 
-  const sortedHistory = [...history].sort((a, b) => {
-    if (sortConfig.direction === "asc") {
-      return a[sortConfig.key] > b[sortConfig.key] ? 1 : -1;
-    } else {
-      return a[sortConfig.key] < b[sortConfig.key] ? 1 : -1;
-    }
-  });
-
-  const filteredHistory = sortedHistory.filter((record) =>
-    record.company_name.toLowerCase().includes(searchTerm.toLowerCase())
-  );
+  const filteredHistory = history;
 
   const calculateAndSubmit = async () => {
-
     try {
-      
-        // Extract values and convert to numbers
-        const data = {
-            user_id: user_id,
-            username: username,
-            company_name: inputs.company_name,
-            stock_price: parseFloat(inputs.stock_price),
-            // Initialize variables for calculations
-            gross_profit_margin: 0,
-            return_on_equity: 0,
-            roic: 0,
-            sga_to_revenue: 0,
-            debt_to_equity: 0,
-            current_ratio: 0,
-            cash_ratio: 0,
-            quick_ratio: parseFloat(inputs.quick_ratio),
-            roa: parseFloat(inputs.roa),
-        };
-
-        // Perform calculations based on the provided method
-        const revenue = parseFloat(inputs.revenue);
-        const cost_of_goods_sold = parseFloat(inputs.cost_of_goods_sold);
-        const net_income = parseFloat(inputs.net_income);
-        const share_holder_equity = parseFloat(inputs.share_holder_equity);
-        const total_debt = parseFloat(inputs.total_debt);
-        const current_asset = parseFloat(inputs.current_asset);
-        const current_liability = parseFloat(inputs.current_liability);
-        const cash_and_cash_equivalents = parseFloat(inputs.cash_and_cash_equivalents);
-
-        // Gross Profit Margin
-        if (revenue) {
-            data.gross_profit_margin = (revenue - cost_of_goods_sold) / revenue;
-        }
-
-        // Return on Equity
-        if (share_holder_equity) {
-            data.return_on_equity = net_income / share_holder_equity;
-        }
-
-        // ROIC calculation
-        if (share_holder_equity) {
-            data.roic = (net_income / share_holder_equity) * 100;
-        }
-
-        // SG&A to Revenue
-        if (revenue) {
-            data.sga_to_revenue = parseFloat(inputs.sga_and_a) / revenue;
-        }
-
-        // Debt Level
-        if (share_holder_equity) {
-            data.debt_to_equity = total_debt / share_holder_equity;
-        }
-
-        // Current Ratio
-        if (current_liability) {
-            data.current_ratio = current_asset / current_liability;
-        }
-
-        // Cash Ratio
-        if (current_liability) {
-            data.cash_ratio = cash_and_cash_equivalents / current_liability;
-        }
-
-        // Perform additional calculations (rating, intrinsic value, margin of safety)
-        const intrinsic_value =
-            inputs.earnings_per_share * (8.5 + 2 * parseFloat(inputs.growth_rate)) * 4.4 / 4.6;
-        const margin_of_safety =
-            (intrinsic_value - data.stock_price) / intrinsic_value;
-        
-        // Final rating
-        let a = 0, b = 0, c = 0;
-
-        // Rating calculation logic
-        if (data.gross_profit_margin > 0.4) a++;
-        if (data.return_on_equity > 0.2) a++;
-        if (data.roic > 30) a++;
-        if (data.sga_to_revenue < 0.3) a++;
-
-        if (data.debt_to_equity < 0.8) b++;
-        if (data.current_ratio > 1.5) c++;
-        if (data.cash_ratio > 1) c++;
-        if (data.quick_ratio > 1) c++;
-
-        if (c === 3) b += 1;
-        else if (c === 2) b += 0.5;
-        else if (c === 1) b += 0.25;
-
-        if (data.roa > 0.1) b++;
-
-        const x = (a + b) / 8;
-
-        const rating = ((margin_of_safety >= 0.4 ? 1 : margin_of_safety / 0.4) * 0.5) + (x * 0.5);
+        // Score on the server with the same model the index loaders use;
+        // empty fields are left out and count as missing
+        const record = { company_name: inputs.company_name };
+        Object.keys(inputs).forEach((key) => {
+            if (key !== "company_name" && inputs[key] !== "") {
+                record[key] = parseFloat(inputs[key]);
+            }
+        });
 
-        // Update the data object with calculated values
-        await axios.post("/api/calculation/create", {
-            ...data,
-            intrinsic_value: intrinsic_value.toFixed(2),
-            margin_of_safety: margin_of_safety.toFixed(2),
-            rating: rating.toFixed(2),
+        const response = await axios.post("/api/calculation/evaluate", {
+            records: [record],
+            save: true,
+        });
+        const [scored] = response.data;
+        setResult({
+            rating: scored.rating,
+            intrinsic_value: scored.intrinsic_value,
+            margin_of_safety: scored.margin_of_safety,
         });
 
         fetchHistory(); // Refresh the history after submission
@@ -293,7 +231,8 @@ const Calculator = () => {
             <TextField
               key={key}
               name={key}
-              label={key.replace(/_/g, " ").toUpperCase()}
+              label={key.replace(/_/g, " ").toUpperCase() + (INPUT_UNITS[key] ? ` (${INPUT_UNITS[key].unit})` : "")}
+              placeholder={INPUT_UNITS[key] ? `e.g. ${INPUT_UNITS[key].example}` : undefined}
               value={inputs[key]}
               onChange={handleInputChange}
               fullWidth
@@ -376,15 +315,15 @@ const Calculator = () => {
               <TableCell sx={{ color: "#ffffff" }}>Stock Price</TableCell>
               <TableCell sx={{ color: "#ffffff" }}>Intrinsic Value</TableCell>
               <TableCell sx={{ color: "#ffffff" }}>Margin of Safety</TableCell>
-              <TableCell sx={{ color: "#ffffff" }}>Gross Profit Margin</TableCell>
-              <TableCell sx={{ color: "#ffffff" }}>Return on Equity</TableCell>
-              <TableCell sx={{ color: "#ffffff" }}>ROIC</TableCell>
-              <TableCell sx={{ color: "#ffffff" }}>SGA to Revenue</TableCell>
+              <TableCell sx={{ color: "#ffffff" }}>Gross Profit Margin (%)</TableCell>
+              <TableCell sx={{ color: "#ffffff" }}>Return on Equity (%)</TableCell>
+              <TableCell sx={{ color: "#ffffff" }}>ROIC (%)</TableCell>
+              <TableCell sx={{ color: "#ffffff" }}>SGA to Revenue (%)</TableCell>
               <TableCell sx={{ color: "#ffffff" }}>Debt to Equity</TableCell>
               <TableCell sx={{ color: "#ffffff" }}>Current Ratio</TableCell>
               <TableCell sx={{ color: "#ffffff" }}>Cash Ratio</TableCell>
               <TableCell sx={{ color: "#ffffff" }}>Quick Ratio</TableCell>
-              <TableCell sx={{ color: "#ffffff" }}>ROA</TableCell>
+              <TableCell sx={{ color: "#ffffff" }}>ROA (%)</TableCell>
               <TableCell sx={{ color: "#fe0004" }}>Delete</TableCell>
             </TableRow>
           </TableHead>
@@ -425,6 +364,12 @@ const Calculator = () => {
         </Table>
       </TableContainer>
 
+      {nextCursor && (
+        <Button variant="outlined" onClick={() => fetchHistory(nextCursor)} sx={{ marginTop: 2, color: "#ffffff", borderColor: "#0095FF" }}>
+          Load More
+        </Button>
+      )}
+
        {/* Delete Confirmation Dialog */}
        <Dialog open={openDeleteDialog} onClose={handleDeleteClose}>
         <DialogTitle sx={{ color: "#ffffff", backgroundColor: "#fe0004" }}>
@@ -22,6 +22,9 @@ import ExpandMoreIcon from "@mui/icons-material/ExpandMore";
 import axios from "axios";
 import styles from "@/styles/forum.module.css";
 
+// Posts per page of the feed
+const FEED_PAGE_SIZE = 20;
+
 const Forum = () => {
   const router = useRouter();
   const isLoggedIn = useBearStore((state) => state.isLoggedIn);
@@ -33,6 +36,8 @@ const Forum = () => {
   const [title, setTitle] = useState("");
   const [content, setContent] = useState("");
   const [posts, setPosts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null); // Cursor of the next feed page, null on the last one
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isPostBoxOpen, setIsPostBoxOpen] = useState(false);
   const [openSnackbar, setOpenSnackbar] = useState(false);
   const [snackbarMessage, setSnackbarMessage] = useState("");
@@ -81,11 +86,34 @@ const Forum = () => {
     }
   }, [isLoggedIn, router]);
 
+  // Replies of every post of a page in one request, keyed by post
+  const fetchRepliesFor = async (forumIds) => {
+    if (forumIds.length === 0) return {};
+    const params = new URLSearchParams();
+    forumIds.forEach((id) => params.append("ids", id));
+    const response = await axios.get(`/api/forum/replies?${params}`);
+    const grouped = Object.fromEntries(forumIds.map((id) => [id, []]));
+    response.data.forEach((reply) => grouped[reply.forum_id].push(reply));
+    return grouped;
+  };
+
+  // One page of the feed plus its replies; `cursor` null starts from the newest post
+  const fetchFeedPage = async (cursor) => {
+    const params = { limit: FEED_PAGE_SIZE };
+    if (cursor) params.cursor = cursor;
+    const response = await axios.get("/api/forum/feed", { params });
+    const page = response.data;
+    const pageReplies = await fetchRepliesFor(page.map((post) => post.forum_id));
+    return { page, pageReplies, next: response.headers["x-next-cursor"] || null };
+  };
+
   const fetchLatestPosts = async () => {
     setLoading(true); // Show loading when fetching posts
     try {
-      const response = await axios.get("/api/forum");
-      setPosts(response.data);
+      const { page, pageReplies, next } = await fetchFeedPage(null);
+      setPosts(page);
+      setReplies(pageReplies);
+      setNextCursor(next);
     } catch (error) {
       console.error("Error fetching posts", error);
     } finally {
@@ -93,6 +121,20 @@ const Forum = () => {
     }
   };
 
+  const fetchMorePosts = async () => {
+    setLoadingMore(true);
+    try {
+      const { page, pageReplies, next } = await fetchFeedPage(nextCursor);
+      setPosts((current) => [...current, ...page]);
+      setReplies((current) => ({ ...current, ...pageReplies }));
+      setNextCursor(next);
+    } catch (error) {
+      console.error("Error fetching posts", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handlePostSubmit = async () => {
     if (title === "" || content === "") {
       setSnackbarMessage("Both title and content are required.");
@@ -213,19 +255,9 @@ const Forum = () => {
     }
   };
 
-  const fetchReplies = async (forumId) => {
-    if (showReplies[forumId]) {
-      setShowReplies({ ...showReplies, [forumId]: false });
-      return;
-    }
-
-    try {
-      const response = await axios.get(`/api/forum/${forumId}/replies`);
-      setReplies({ ...replies, [forumId]: response.data });
-      setShowReplies({ ...showReplies, [forumId]: true });
-    } catch (error) {
-      console.error("Error fetching replies", error);
-    }
+  // Replies come with their page of the feed, so this only shows or hides them
+  const toggleReplies = (forumId) => {
+    setShowReplies({ ...showReplies, [forumId]: !showReplies[forumId] });
   };
 
   const handleCloseSnackbar = () => {
@@ -466,9 +498,9 @@ const Forum = () => {
 
               <Box>
               <Divider sx={{ borderColor: 'grey', borderWidth: 1, my: 2 }} />
-                <Button onClick={() => fetchReplies(post.forum_id)}>
+                <Button onClick={() => toggleReplies(post.forum_id)}>
                   <ExpandMoreIcon />
-                  {showReplies[post.forum_id] ? "Hide Replies" : "Show Replies"}
+                  {showReplies[post.forum_id] ? "Hide Replies" : `Show Replies (${post.reply_count})`}
                 </Button>
                 {showReplies[post.forum_id] && (
                   <Box sx={{ marginTop: 1 }}>
@@ -490,6 +522,13 @@ const Forum = () => {
               </Box>
             </Paper>
           ))}
+          {nextCursor && (
+            <Box sx={{ display: "flex", justifyContent: "center", marginTop: 2 }}>
+              <Button variant="contained" onClick={fetchMorePosts} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load More"}
+              </Button>
+            </Box>
+          )}
         </Grid>
       </Grid>
     </Box>
@@ -15,51 +15,112 @@ import {
   Button,
 } from "@mui/material";
 
+// Rows per page of the screener
+const PAGE_SIZE = 50;
+
 const DisplayPage = () => {
   // Updated state variables to reflect Nasdaq100
   const [nasdaq100, setNasdaq100] = useState([]);
   const [searchQuery, setSearchQuery] = useState("");
+  const [matches, setMatches] = useState(null); // Tickers the server matched, null to filter locally
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [sortBy, setSortBy] = useState("company"); // Default sorting by company name
   const [sortDirection, setSortDirection] = useState("asc"); // Default sorting direction
+  const [nextCursor, setNextCursor] = useState(null); // Cursor of the next page, null on the last one
+  const [loadingMore, setLoadingMore] = useState(false);
 
+  // Search tickers and company names on the server (prefix and typo tolerant), debounced while typing
   useEffect(() => {
-    const fetchNasdaq100 = async () => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setMatches(null);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
       try {
-        const response = await fetch("/api/nasdaq100"); // Updated API endpoint
+        const params = new URLSearchParams({ q: query, scope: "companies", index: "nasdaq100", limit: "50" });
+        const response = await fetch(`/api/search?${params}`, { signal: controller.signal });
         if (!response.ok) {
-          throw new Error("Failed to fetch Nasdaq100 data");
+          throw new Error("Search failed");
         }
         const data = await response.json();
-        setNasdaq100(data);
+        setMatches(data.companies.map((match) => match.company));
       } catch (error) {
-        console.error("Error fetching Nasdaq100 data:", error);
-        setError(error.message);
-      } finally {
-        setLoading(false);
+        if (error.name !== "AbortError") {
+          setMatches(null); // Fall back to matching tickers locally
+        }
       }
+    }, 150);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
     };
+  }, [searchQuery]);
 
-    fetchNasdaq100();
-  }, []);
+  // One request to the screener, sorted on the server; `extra` adds paging or ticker parameters
+  const fetchRows = async (extra) => {
+    const params = new URLSearchParams({ order_by: sortBy, order: sortDirection });
+    extra.forEach(([key, value]) => params.append(key, value));
+    const response = await fetch(`/api/nasdaq100?${params}`);
+    if (!response.ok) {
+      throw new Error("Failed to fetch Nasdaq100 data");
+    }
+    return { rows: await response.json(), next: response.headers.get("X-Next-Cursor") };
+  };
 
-  // Filter Nasdaq100 components based on search query
-  const filteredNasdaq100 = nasdaq100.filter((item) =>
-    item.company.toLowerCase().includes(searchQuery.toLowerCase())
-  );
+  // Reload from the first page whenever the sort or the search matches change
+  useEffect(() => {
+    let cancelled = false;
+    const load = async () => {
+      try {
+        let page = { rows: [], next: null };
+        if (!matches) {
+          page = await fetchRows([["limit", PAGE_SIZE]]);
+        } else if (matches.length > 0) {
+          page = await fetchRows(matches.map((company) => ["company", company]));
+        }
+        if (!cancelled) {
+          setNasdaq100(page.rows);
+          setNextCursor(matches ? null : page.next);
+          setError(null);
+        }
+      } catch (error) {
+        console.error("Error fetching Nasdaq100 data:", error);
+        if (!cancelled) setError(error.message);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    };
 
-  // Sorting Function
-  const sortedNasdaq100 = [...filteredNasdaq100].sort((a, b) => {
-    const aValue = sortBy === "company" ? a.company : a.rating;
-    const bValue = sortBy === "company" ? b.company : b.rating;
+    load();
+    return () => {
+      cancelled = true;
+    };
+  }, [sortBy, sortDirection, matches]);
 
-    if (sortDirection === "asc") {
-      return aValue > bValue ? 1 : -1;
-    } else {
-      return aValue < bValue ? 1 : -1;
+  const fetchMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchRows([["limit", PAGE_SIZE], ["cursor", nextCursor]]);
+      setNasdaq100((current) => [...current, ...page.rows]);
+      setNextCursor(page.next);
+    } catch (error) {
+      console.error("Error fetching Nasdaq100 data:", error);
+      setError(error.message);
+    } finally {
+      setLoadingMore(false);
     }
-  });
+  };
+
+  // Rows come filtered and ordered by the server; while the search endpoint is
+  // unavailable, match tickers among the rows loaded so far
+  const displayedNasdaq100 = matches || !searchQuery.trim()
+    ? nasdaq100
+    : nasdaq100.filter((item) =>
+        item.company.toLowerCase().includes(searchQuery.trim().toLowerCase())
+      );
 
   return (
     <Box
@@ -139,7 +200,7 @@ const DisplayPage = () => {
         </Box>
 
         <TextField
-          label="Search by Company Name"
+          label="Search by Ticker or Company Name"
           variant="outlined"
           size="small"
           value={searchQuery}
@@ -323,7 +384,7 @@ const DisplayPage = () => {
               </TableRow>
             </TableHead>
             <TableBody>
-              {sortedNasdaq100.map((item, index) => (
+              {displayedNasdaq100.map((item, index) => (
                 <TableRow
                   key={item.company}
                   sx={{
@@ -432,6 +493,13 @@ const DisplayPage = () => {
           </Table>
         </TableContainer>
       )}
+      {!loading && !error && nextCursor && (
+        <Box sx={{ display: "flex", justifyContent: "center", marginTop: 2 }}>
+          <Button variant="contained" onClick={fetchMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load More"}
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 };
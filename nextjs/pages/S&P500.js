@@ -15,50 +15,111 @@ import {
   Button,
 } from "@mui/material";
 
+// Rows per page of the screener
+const PAGE_SIZE = 50;
+
 const DisplayPage = () => {
   const [sp500, setSp500] = useState([]);
   const [searchQuery, setSearchQuery] = useState("");
+  const [matches, setMatches] = useState(null); // Tickers the server matched, null to filter locally
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [sortBy, setSortBy] = useState("company"); // Default sorting by company name
   const [sortDirection, setSortDirection] = useState("asc"); // Default sorting direction
+  const [nextCursor, setNextCursor] = useState(null); // Cursor of the next page, null on the last one
+  const [loadingMore, setLoadingMore] = useState(false);
 
+  // Search tickers and company names on the server (prefix and typo tolerant), debounced while typing
   useEffect(() => {
-    const fetchSP500 = async () => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setMatches(null);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
       try {
-        const response = await fetch("/api/sp500");
+        const params = new URLSearchParams({ q: query, scope: "companies", index: "sp500", limit: "50" });
+        const response = await fetch(`/api/search?${params}`, { signal: controller.signal });
         if (!response.ok) {
-          throw new Error("Failed to fetch SP500 data");
+          throw new Error("Search failed");
         }
         const data = await response.json();
-        setSp500(data);
+        setMatches(data.companies.map((match) => match.company));
       } catch (error) {
-        console.error("Error fetching SP500 data:", error);
-        setError(error.message);
-      } finally {
-        setLoading(false);
+        if (error.name !== "AbortError") {
+          setMatches(null); // Fall back to matching tickers locally
+        }
       }
+    }, 150);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
     };
+  }, [searchQuery]);
 
-    fetchSP500();
-  }, []);
+  // One request to the screener, sorted on the server; `extra` adds paging or ticker parameters
+  const fetchRows = async (extra) => {
+    const params = new URLSearchParams({ order_by: sortBy, order: sortDirection });
+    extra.forEach(([key, value]) => params.append(key, value));
+    const response = await fetch(`/api/sp500?${params}`);
+    if (!response.ok) {
+      throw new Error("Failed to fetch SP500 data");
+    }
+    return { rows: await response.json(), next: response.headers.get("X-Next-Cursor") };
+  };
 
-  // Filter SP500 components based on search query
-  const filteredSP500 = sp500.filter((item) =>
-    item.company.toLowerCase().includes(searchQuery.toLowerCase())
-  );
+  // Reload from the first page whenever the sort or the search matches change
+  useEffect(() => {
+    let cancelled = false;
+    const load = async () => {
+      try {
+        let page = { rows: [], next: null };
+        if (!matches) {
+          page = await fetchRows([["limit", PAGE_SIZE]]);
+        } else if (matches.length > 0) {
+          page = await fetchRows(matches.map((company) => ["company", company]));
+        }
+        if (!cancelled) {
+          setSp500(page.rows);
+          setNextCursor(matches ? null : page.next);
+          setError(null);
+        }
+      } catch (error) {
+        console.error("Error fetching SP500 data:", error);
+        if (!cancelled) setError(error.message);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    };
 
-  // Sorting Function
-  const sortedSP500 = [...filteredSP500].sort((a, b) => {
-    const aValue = sortBy === "company" ? a.company : a.rating;
-    const bValue = sortBy === "company" ? b.company : b.rating;
+    load();
+    return () => {
+      cancelled = true;
+    };
+  }, [sortBy, sortDirection, matches]);
 
-    if (sortDirection === "asc") {
-      return aValue > bValue ? 1 : -1;
-    } else {
-      return aValue < bValue ? 1 : -1;
+  const fetchMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchRows([["limit", PAGE_SIZE], ["cursor", nextCursor]]);
+      setSp500((current) => [...current, ...page.rows]);
+      setNextCursor(page.next);
+    } catch (error) {
+      console.error("Error fetching SP500 data:", error);
+      setError(error.message);
+    } finally {
+      setLoadingMore(false);
     }
-  });
+  };
+
+  // Rows come filtered and ordered by the server; while the search endpoint is
+  // unavailable, match tickers among the rows loaded so far
+  const displayedSP500 = matches || !searchQuery.trim()
+    ? sp500
+    : sp500.filter((item) =>
+        item.company.toLowerCase().includes(searchQuery.trim().toLowerCase())
+      );
 
   return (
     <Box
@@ -135,7 +196,7 @@ const DisplayPage = () => {
         </Box>
 
         <TextField
-          label="Search by Company Name"
+          label="Search by Ticker or Company Name"
           variant="outlined"
           size="small"
           value={searchQuery}
@@ -203,7 +264,7 @@ const DisplayPage = () => {
               </TableRow>
             </TableHead>
             <TableBody>
-              {sortedSP500.map((item, index) => (
+              {displayedSP500.map((item, index) => (
                 <TableRow 
                   key={item.company} 
                   sx={{
@@ -233,6 +294,13 @@ const DisplayPage = () => {
           </Table>
         </TableContainer>
       )}
+      {!loading && !error && nextCursor && (
+        <Box sx={{ display: "flex", justifyContent: "center", marginTop: 2 }}>
+          <Button variant="contained" onClick={fetchMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load More"}
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 };
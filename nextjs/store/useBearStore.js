@@ -15,6 +15,8 @@ const useBearStore = create((set) => ({
     localStorage.setItem("isAdmin", isAdmin.toString());
   },
   logout: () => {
+    // Drop the HttpOnly session cookie set by /api/users/login
+    fetch("/api/users/logout", { method: "POST" }).catch(() => {});
     set({ isLoggedIn: false, username: null, user_id: null, isAdmin: false });
     localStorage.removeItem("isLoggedIn");
     localStorage.removeItem("username");
@@ -0,0 +1,7 @@
+# tests/conftest.py
+# Make the API's flat modules (database, auth, routes, ...) importable as the app imports them
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fastapi"))
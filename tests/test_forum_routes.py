@@ -0,0 +1,40 @@
+# tests/test_forum_routes.py
+# Forum write routes, with the database calls replaced by fakes
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.forum as forum
+from auth import SessionUser, current_user
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(forum.router, prefix="/api")
+    app.dependency_overrides[current_user] = lambda: SessionUser(user_id=7, is_admin=False, expires_at=0)
+    return TestClient(app)
+
+
+def test_delete_post(client, monkeypatch):
+    deleted = []
+
+    async def delete_forum_post(forum_id, owner_id=None):
+        deleted.append((forum_id, owner_id))
+        return {"forum_id": forum_id}
+
+    monkeypatch.setattr(forum, "delete_forum_post", delete_forum_post)
+    response = client.delete("/api/forum/delete/3")
+    assert response.status_code == 200
+    assert response.json() == {"message": "Post deleted successfully"}
+    assert deleted == [(3, 7)]
+
+
+def test_delete_missing_post(client, monkeypatch):
+    async def delete_forum_post(forum_id, owner_id=None):
+        return None
+
+    monkeypatch.setattr(forum, "delete_forum_post", delete_forum_post)
+    response = client.delete("/api/forum/delete/3")
+    assert response.status_code == 404
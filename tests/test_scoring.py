@@ -0,0 +1,140 @@
+# tests/test_scoring.py
+# Pins the ratings of the vectorized model to the per-ticker loop it replaced
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingestion.scoring import THRESHOLDS, score, score_one
+
+# Raw fundamentals of one healthy company; each fixture row below changes a few of them
+BASE = {
+    "revenue": 1000.0, "cost_of_goods_sold": 400.0, "net_income": 250.0, "share_holder_equity": 1000.0,
+    "sga_and_a": 200.0, "total_debt": 500.0, "current_asset": 3000.0, "current_liability": 1500.0,
+    "cash_and_cash_equivalents": 1600.0, "operating_income": 500.0, "tax_rate": 0.2, "total_assets": 3000.0,
+    "current_liabilities": 400.0, "earnings_per_share": 5.0, "growth_rate": 8.0, "corporate_bond_yield": 4.6,
+    "stock_price": 50.0, "quick_ratio": 1.2, "roa": 12.5,
+}
+
+FIXTURE = {
+    "healthy": {},
+    "zero_revenue": {"revenue": 0.0, "cost_of_goods_sold": 0.0},
+    "zero_equity": {"share_holder_equity": 0.0},
+    "zero_liabilities": {"current_liability": 0.0},
+    "zero_invested_capital": {"total_assets": 2000.0, "current_liabilities": 400.0, "cash_and_cash_equivalents": 1600.0},
+    "no_eps": {"earnings_per_share": None},
+    "negative_eps": {"earnings_per_share": -2.0},
+    "overpriced": {"stock_price": 500.0, "quick_ratio": 0.5, "roa": 3.0},
+    "unknown_rates": {"tax_rate": None, "growth_rate": None, "corporate_bond_yield": None},
+}
+
+# Ratings of FIXTURE at the current THRESHOLDS; a change here is a change to every stored rating
+EXPECTED_RATINGS = {
+    "healthy": 0.9375,
+    "zero_revenue": 0.8125,
+    "zero_equity": 0.875,
+    "zero_liabilities": 0.890625,
+    "zero_invested_capital": 0.875,
+    "no_eps": 0.4375,
+    "negative_eps": 0.4375,
+    "overpriced": 0.34375,
+    "unknown_rates": 0.9375,
+}
+
+
+def fundamentals(name: str) -> dict:
+    return {**BASE, **FIXTURE[name]}
+
+
+def reference_score(f: dict) -> dict:
+    """The rating of one company, computed as the original per-ticker loader loop did."""
+    tax_rate = 0.21 if f["tax_rate"] is None else f["tax_rate"]
+    growth_rate = 8.0 if f["growth_rate"] is None else f["growth_rate"]
+    bond_yield = 4.6 if f["corporate_bond_yield"] is None else f["corporate_bond_yield"]
+
+    invested_capital = f["total_assets"] - f["current_liabilities"] - f["cash_and_cash_equivalents"]
+    roic = (f["operating_income"] * (1 - tax_rate) / invested_capital if invested_capital != 0 else 0) * 100
+    gross_profit_margin = (f["revenue"] - f["cost_of_goods_sold"]) / f["revenue"] * 100 if f["revenue"] != 0 else 0
+    return_on_equity = f["net_income"] / f["share_holder_equity"] * 100 if f["share_holder_equity"] != 0 else 0
+    sga_to_revenue = f["sga_and_a"] / f["revenue"] * 100 if f["revenue"] != 0 else None
+    debt_to_equity = f["total_debt"] / f["share_holder_equity"] if f["share_holder_equity"] != 0 else 0
+    current_ratio = f["current_asset"] / f["current_liability"] if f["current_liability"] != 0 else 0
+    cash_ratio = f["cash_and_cash_equivalents"] / f["current_liability"] if f["current_liability"] != 0 else 0
+
+    a = (gross_profit_margin > 40) + (return_on_equity > 20) + (roic > 30)
+    a += sga_to_revenue is not None and sga_to_revenue < 30
+    b = float(debt_to_equity < 0.8)
+    c = (current_ratio > 1.5) + (cash_ratio > 1) + (f["quick_ratio"] is not None and f["quick_ratio"] > 1)
+    b += {0: 0, 1: 0.25, 2: 0.5, 3: 1}[c]
+    b += f["roa"] is not None and f["roa"] > 10
+    quality = (a + b) / 8
+
+    eps = f["earnings_per_share"]
+    intrinsic_value = eps * (8.5 + 2 * growth_rate) * 4.4 / bond_yield if eps is not None else 0
+    margin_of_safety = (intrinsic_value - f["stock_price"]) / intrinsic_value if intrinsic_value > 0 else None
+    normalized_value = 0 if margin_of_safety is None else min(max(margin_of_safety / 0.4, 0), 1)
+    return {"quality": quality, "margin_of_safety": margin_of_safety, "rating": normalized_value * 0.5 + quality * 0.5}
+
+
+@pytest.mark.parametrize("name", FIXTURE)
+def test_score_one_matches_reference(name):
+    expected = reference_score(fundamentals(name))
+    result = score_one(fundamentals(name))
+    assert result["rating"] == pytest.approx(expected["rating"])
+    assert result["quality"] == pytest.approx(expected["quality"])
+    if expected["margin_of_safety"] is None:
+        assert result["margin_of_safety"] is None
+    else:
+        assert result["margin_of_safety"] == pytest.approx(expected["margin_of_safety"])
+
+
+def test_ratings_are_pinned():
+    frame = pd.DataFrame.from_dict({name: fundamentals(name) for name in FIXTURE}, orient="index")
+    scored = score(frame)
+    assert list(scored.index) == list(FIXTURE)
+    assert scored["rating"].to_dict() == pytest.approx(EXPECTED_RATINGS)
+
+
+def test_batch_matches_single_rows():
+    frame = pd.DataFrame.from_dict({name: fundamentals(name) for name in FIXTURE}, orient="index")
+    scored = score(frame)
+    for name in FIXTURE:
+        single = score_one(fundamentals(name))
+        for column, value in single.items():
+            if value is None:
+                assert np.isnan(scored.at[name, column])
+            else:
+                assert scored.at[name, column] == pytest.approx(value)
+
+
+def test_zero_denominators_score_like_the_loader_loop():
+    # Zero revenue / equity / liabilities / invested capital read as a 0 ratio, not an error
+    result = score_one(fundamentals("zero_revenue"))
+    assert result["gross_profit_margin"] == 0
+    assert result["sga_to_revenue"] is None
+    result = score_one(fundamentals("zero_equity"))
+    assert result["return_on_equity"] == 0
+    assert result["debt_to_equity"] == 0
+    result = score_one(fundamentals("zero_liabilities"))
+    assert result["current_ratio"] == 0
+    assert result["cash_ratio"] == 0
+    assert score_one(fundamentals("zero_invested_capital"))["roic"] == 0
+
+
+def test_infinite_metrics_earn_no_points():
+    # A zero denominator upstream (e.g. quick ratio over no current liabilities) gives inf.
+    # The loader loop counted inf as above every threshold; the model reports NaN and no point.
+    finite = score_one({**BASE, "quick_ratio": 0.5, "roa": 3.0})
+    infinite = score_one({**BASE, "quick_ratio": math.inf, "roa": -math.inf})
+    assert infinite["quick_ratio"] is None
+    assert infinite["roa"] is None
+    assert infinite["quality"] == finite["quality"]
+    assert infinite["rating"] == finite["rating"]
+
+
+def test_thresholds_change_the_rating():
+    # Ratings follow THRESHOLDS, so the pinned values above guard every edit to them
+    stricter = {**THRESHOLDS, "roic": 45}
+    assert score_one(fundamentals("healthy"), stricter)["rating"] == pytest.approx(EXPECTED_RATINGS["healthy"] - 1 / 16)
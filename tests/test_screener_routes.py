@@ -0,0 +1,58 @@
+# tests/test_screener_routes.py
+# Index screening routes, with the database calls replaced by fakes
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import screener
+from routes.sp500 import router
+
+VERSION = {"version": 3, "updated_at": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    queries = []
+
+    async def get_index_version(table):
+        return VERSION
+
+    async def screen_index(view, columns, filters, order_by="company", descending=False, limit=None, offset=0, after=None,
+                           companies=None):
+        queries.append((view, filters, order_by, descending, limit, after, companies))
+        return [{"company": "AAPL", "rating": 0.5}]
+
+    monkeypatch.setattr(screener, "get_index_version", get_index_version)
+    monkeypatch.setattr(screener, "screen_index", screen_index)
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    test_client = TestClient(app)
+    test_client.queries = queries
+    return test_client
+
+
+@pytest.mark.parametrize("query", ["order_by=nope", "fields=company,nope", "roic_gt=abc", "order_by=rating&cursor=WyJhYmMiLCAiQSJd"])
+def test_bad_parameters_are_rejected_before_revalidation(client, query):
+    current = {"If-Modified-Since": "Thu, 01 Jan 2026 00:00:00 GMT"}
+    response = client.get(f"/api/sp500?{query}", headers=current)
+    assert response.status_code == 400
+    assert client.queries == []
+
+
+def test_current_client_gets_304_without_a_query(client):
+    response = client.get("/api/sp500?order_by=rating&limit=1")
+    assert response.status_code == 200
+    assert response.headers["x-next-cursor"]
+    response = client.get("/api/sp500?order_by=rating&limit=1", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+    assert len(client.queries) == 1
+
+
+def test_company_parameters_select_tickers(client):
+    response = client.get("/api/sp500?company=aapl&company=MSFT&order_by=rating&order=desc")
+    assert response.status_code == 200
+    view, filters, order_by, descending, limit, after, companies = client.queries[-1]
+    assert (view, filters, order_by, descending, companies) == ("SP500_latest", [], "rating", True, ["AAPL", "MSFT"])